@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -11,6 +12,18 @@ import yaml
 
 from .models import RunConfig
 
+try:  # pragma: no cover - import path depends on optional dependency
+    import orjson as _orjson
+except Exception:  # pragma: no cover - optional dependency not installed
+    _orjson = None
+
+
+def parse_json(text: str | bytes) -> Any:
+    """Parse JSON text, using orjson when it is installed."""
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
 
 def load_yaml_config(path: Path | None) -> dict[str, Any]:
     """Load YAML config or return empty dict when path is absent."""
@@ -104,13 +117,16 @@ def validate_run_config(config: RunConfig) -> None:
         raise ValueError("sequence_count_selector 不能为空。")
 
 
+@lru_cache(maxsize=1024)
 def compute_job_id(config: RunConfig) -> str:
     """Build stable job identifier from identity fields."""
+    # Always stdlib json: the hashed text must not depend on installed extras.
     raw = json.dumps(config.as_job_identity(), sort_keys=True, ensure_ascii=True)
     digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
     return f"job_{digest}"
 
 
+@lru_cache(maxsize=1024)
 def run_config_json(config: RunConfig) -> str:
     """Serialize config as JSON for persistence."""
     payload = {
@@ -142,4 +158,6 @@ def run_config_json(config: RunConfig) -> str:
         "sequence_require_upper_bound": config.sequence_require_upper_bound,
         "sequence_probe_after_upper_bound": config.sequence_probe_after_upper_bound,
     }
+    if _orjson is not None:
+        return _orjson.dumps(payload, option=_orjson.OPT_SORT_KEYS).decode("utf-8")
     return json.dumps(payload, ensure_ascii=True, sort_keys=True)
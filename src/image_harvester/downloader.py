@@ -214,9 +214,5 @@ class ImageDownloader:
 
 def file_sha256(path: Path) -> str:
     """Compute SHA-256 for an existing file."""
-    hasher = hashlib.sha256()
     with path.open("rb") as fp:
-        for chunk in iter(lambda: fp.read(8192), b""):
-            if chunk:
-                hasher.update(chunk)
-    return hasher.hexdigest()
+        return hashlib.file_digest(fp, "sha256").hexdigest()
@@ -13,9 +13,9 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class RunConfig:
-    """Runtime configuration for a harvesting job."""
+    """Runtime configuration for a harvesting job (immutable, hashable)."""
 
     url_template: str
     start_num: int
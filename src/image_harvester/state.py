@@ -5,8 +5,9 @@ from __future__ import annotations
 import sqlite3
 import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from .models import ImageRecord, JobState, PageState, utc_now_iso
 
@@ -20,6 +21,7 @@ class StateStore:
         *,
         batch_size: int = 1,
         flush_interval_ms: int = 0,
+        durable: bool = True,
     ) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -30,10 +32,18 @@ class StateStore:
         self._flush_interval_sec = 0.0
         self._pending_writes = 0
         self._last_commit_ts = time.monotonic()
+        self._tx_depth = 0
 
         with self._lock:
-            self.conn.execute("PRAGMA journal_mode = WAL;")
-            self.conn.execute("PRAGMA synchronous = NORMAL;")
+            if durable:
+                self.conn.execute("PRAGMA journal_mode = WAL;")
+                self.conn.execute("PRAGMA synchronous = NORMAL;")
+            else:
+                # Scratch databases (tests, throwaway runs): no journal file, no fsync.
+                self.conn.execute("PRAGMA journal_mode = MEMORY;")
+                self.conn.execute("PRAGMA synchronous = OFF;")
+            self.conn.execute("PRAGMA busy_timeout = 5000;")
+            self.conn.execute("PRAGMA temp_store = MEMORY;")
             self.conn.execute("PRAGMA foreign_keys = ON;")
             self._init_schema_locked()
             self.set_write_batching(batch_size=batch_size, flush_interval_ms=flush_interval_ms)
@@ -43,6 +53,12 @@ class StateStore:
             self._commit_locked()
             self.conn.close()
 
+    def __enter__(self) -> StateStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     def set_write_batching(self, *, batch_size: int, flush_interval_ms: int) -> None:
         with self._lock:
             self._batch_size = max(1, int(batch_size))
@@ -54,6 +70,52 @@ class StateStore:
         with self._lock:
             self._commit_locked()
 
+    def data_version(self) -> int:
+        """Return SQLite's data_version; it changes once another connection commits."""
+        with self._lock:
+            row = self.conn.execute("PRAGMA data_version").fetchone()
+        return int(row[0])
+
+    @contextmanager
+    def read_transaction(self) -> Iterator[None]:
+        """Run several reads against one consistent database snapshot.
+
+        Inside `transaction()` the reads join the open write transaction.
+        """
+        with self._lock:
+            if self._tx_depth:
+                yield
+                return
+            self._commit_locked()
+            self.conn.execute("BEGIN")
+            try:
+                yield
+            finally:
+                self.conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Commit all writes in the block at once, or roll them back on error.
+
+        Nested blocks join the outermost transaction.
+        """
+        with self._lock:
+            if self._tx_depth == 0:
+                self._commit_locked()
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._tx_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self.conn.rollback()
+                    self._pending_writes = 0
+                raise
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self._commit_locked()
+
     def _init_schema_locked(self) -> None:
         self.conn.executescript(
             """
@@ -114,6 +176,8 @@ class StateStore:
             );
 
             CREATE INDEX IF NOT EXISTS idx_pages_job_id ON pages(job_id);
+            CREATE INDEX IF NOT EXISTS idx_pages_job_updated
+              ON pages(job_id, updated_at DESC, page_num DESC);
             CREATE INDEX IF NOT EXISTS idx_images_page_id ON images(page_id);
             CREATE INDEX IF NOT EXISTS idx_images_status ON images(status);
             CREATE INDEX IF NOT EXISTS idx_events_job_id ON events(job_id);
@@ -135,6 +199,8 @@ class StateStore:
                 self._commit_locked()
 
     def _commit_locked(self) -> None:
+        if self._tx_depth:
+            return
         self.conn.commit()
         self._pending_writes = 0
         self._last_commit_ts = time.monotonic()
@@ -294,6 +360,20 @@ class StateStore:
             ).fetchall()
         return [self._row_to_page(row) for row in rows]
 
+    def list_pages_for_display(self, job_id: str, limit: int = 200) -> list[PageState]:
+        """List most recently updated pages first, capped at `limit`."""
+        with self._lock:
+            self._flush_on_read_if_due_locked()
+            rows = self.conn.execute(
+                """
+                SELECT * FROM pages WHERE job_id = ?
+                ORDER BY updated_at DESC, page_num DESC
+                LIMIT ?
+                """,
+                (job_id, limit),
+            ).fetchall()
+        return [self._row_to_page(row) for row in rows]
+
     def update_page(
         self,
         page_id: int,
@@ -446,7 +526,7 @@ class StateStore:
             )
             self._mark_write_locked()
 
-    def get_failed_images(self, job_id: str, limit: int | None = None) -> list[dict[str, Any]]:
+    def get_failed_images(self, job_id: str, limit: int | None = None) -> list[sqlite3.Row]:
         query = """
             SELECT i.*, p.page_num, p.page_url, p.source_id, p.id AS page_id
             FROM images i
@@ -460,8 +540,7 @@ class StateStore:
             params.append(limit)
         with self._lock:
             self._flush_on_read_if_due_locked()
-            rows = self.conn.execute(query, params).fetchall()
-        return [dict(row) for row in rows]
+            return self.conn.execute(query, params).fetchall()
 
     def stats_for_job(self, job_id: str) -> dict[str, Any]:
         job = self.get_job(job_id)
@@ -503,19 +582,39 @@ class StateStore:
             "images": dict(image_totals) if image_totals else {},
         }
 
-    def list_events(self, job_id: str, limit: int = 50) -> list[dict[str, Any]]:
+    def list_events(
+        self,
+        job_id: str,
+        limit: int = 50,
+        *,
+        after_id: int | None = None,
+    ) -> list[sqlite3.Row]:
+        """List newest events first, optionally only those with id > `after_id`.
+
+        Rows unpack as `(id, page_id, event_type, message, created_at)`.
+        """
         with self._lock:
             self._flush_on_read_if_due_locked()
             rows = self.conn.execute(
                 """
                 SELECT id, page_id, event_type, message, created_at
-                FROM events WHERE job_id = ?
+                FROM events WHERE job_id = ? AND id > ?
                 ORDER BY id DESC
                 LIMIT ?
                 """,
-                (job_id, limit),
+                (job_id, after_id if after_id is not None else -1, limit),
             ).fetchall()
-        return [dict(row) for row in rows]
+        return rows
+
+    def has_event(self, job_id: str, event_type: str) -> bool:
+        """Return whether the job has logged at least one event of `event_type`."""
+        with self._lock:
+            self._flush_on_read_if_due_locked()
+            row = self.conn.execute(
+                "SELECT 1 FROM events WHERE job_id = ? AND event_type = ? LIMIT 1",
+                (job_id, event_type),
+            ).fetchone()
+        return row is not None
 
     def _row_to_page(self, row: sqlite3.Row) -> PageState:
         return PageState(
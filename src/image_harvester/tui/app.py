@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 from ..models import RunConfig
 from .forms import RunConfigForm, build_run_config_from_form, payload_from_run_config
-from .services import RunWorker, SnapshotService
+from .services import DashboardState, JobSnapshot, RunWorker, SnapshotService
+
+_DEFAULT_STATE_DB = Path("data/state.sqlite3")
+# With no running worker, refresh from SQLite only every N ticks as a safety net.
+_IDLE_REFRESH_TICKS = 5
+# Recently used state dbs keep their SnapshotService when the path is switched back.
+_SNAPSHOT_POOL_SIZE = 4
 
 _TEXTUAL_IMPORT_ERROR: Exception | None = None
 try:  # pragma: no cover - import path depends on optional dependency
     from textual.app import App, ComposeResult
     from textual.containers import Horizontal, Vertical, VerticalScroll
+    from textual.message import Message
     from textual.widgets import Button, DataTable, Footer, Header, Static
 
     from .widgets import EventsTable, FailedImagesTable, JobsTable, PagesTable, StatsPanel
@@ -21,6 +30,9 @@ except Exception as exc:  # pragma: no cover - optional dependency not installed
 
 if _TEXTUAL_IMPORT_ERROR is None:
 
+    class RunStateChanged(Message):
+        """Posted from the runner thread when RunWorker state changes."""
+
     class HarvesterTUIApp(App[None]):
         """Terminal UI for running and monitoring jobs."""
 
@@ -102,11 +114,20 @@ if _TEXTUAL_IMPORT_ERROR is None:
             self._worker: RunWorker | None = None
             self._snapshot_service: SnapshotService | None = None
             self._snapshot_db: Path | None = None
+            self._snapshot_pool: OrderedDict[Path, SnapshotService] = OrderedDict()
             self._selected_job_id: str | None = None
             self._last_worker_status: str | None = None
             self._last_warning_fingerprint: str | None = None
+            self._last_status_message: str | None = None
             self._quit_guard_armed = False
             self._auto_restore_done = False
+            self._idle_ticks = 0
+            # Last rendered dashboard; the service returns the same object while SQLite is unchanged.
+            self._last_dashboard: DashboardState | None = None
+            # (job_id, job started_at, newest shown event id) for incremental event reads.
+            self._events_cursor: tuple[str, str, int] | None = None
+            # Set by the runner thread once a RunStateChanged is queued; cleared when handled.
+            self._state_change_pending = threading.Event()
 
         def compose(self) -> ComposeResult:
             yield Header(show_clock=True)
@@ -131,9 +152,19 @@ if _TEXTUAL_IMPORT_ERROR is None:
             yield Footer()
 
         def on_mount(self) -> None:
-            self._auto_restore_latest_job_on_mount()
+            # Restore reads SQLite; defer it so the first frame paints immediately.
+            self.call_after_refresh(self._restore_then_refresh)
+            self.set_interval(1.0, self._on_refresh_tick)
+
+        def on_unmount(self) -> None:
+            for service in self._snapshot_pool.values():
+                service.close()
+            self._snapshot_pool.clear()
+
+        def on_run_state_changed(self, _: RunStateChanged) -> None:
+            # Clear first so a transition during the refresh queues one more pass.
+            self._state_change_pending.clear()
             self._refresh_all()
-            self.set_interval(1.0, self._refresh_all)
 
         def action_refresh(self) -> None:
             self._refresh_all()
@@ -196,7 +227,10 @@ if _TEXTUAL_IMPORT_ERROR is None:
             if form is not None:
                 form.set_error("")
 
-            worker = RunWorker(run_config)
+            worker = RunWorker(
+                run_config,
+                on_state_change=self._on_worker_state_change,
+            )
             try:
                 worker.start()
             except Exception as exc:
@@ -219,7 +253,11 @@ if _TEXTUAL_IMPORT_ERROR is None:
                 self._set_status(f"任务已启动: {worker.job_id}")
             return True
 
-        def _auto_restore_latest_job_on_mount(self) -> None:
+        def _restore_then_refresh(self) -> None:
+            self._auto_restore_latest_job()
+            self._refresh_all()
+
+        def _auto_restore_latest_job(self) -> None:
             if self._auto_restore_done:
                 return
             self._auto_restore_done = True
@@ -233,7 +271,7 @@ if _TEXTUAL_IMPORT_ERROR is None:
             if latest is None:
                 return
 
-            fallback_db = self._snapshot_db or Path("data/state.sqlite3")
+            fallback_db = self._snapshot_db or _DEFAULT_STATE_DB
             run_config = service.load_run_config_from_job(
                 latest.job_id,
                 fallback_state_db=fallback_db,
@@ -259,18 +297,35 @@ if _TEXTUAL_IMPORT_ERROR is None:
             else:
                 self._set_status(f"已回填上次任务配置: {latest.job_id}")
 
+        def _on_worker_state_change(self) -> None:
+            # Runs on the runner thread; bursts of transitions share one queued refresh.
+            if self._state_change_pending.is_set():
+                return
+            self._state_change_pending.set()
+            self.post_message(RunStateChanged())
+
+        def _on_refresh_tick(self) -> None:
+            # Progress rows are only written while a worker runs; otherwise poll slowly.
+            self._idle_ticks += 1
+            worker_running = self._worker is not None and self._worker.is_running()
+            if worker_running or self._idle_ticks >= _IDLE_REFRESH_TICKS:
+                self._refresh_all()
+
         def _refresh_all(self) -> None:
+            self._idle_ticks = 0
             self._sync_worker_state()
             self._sync_snapshot_service()
-            self._refresh_job_list()
-            self._refresh_selected_snapshot()
+            self._refresh_dashboard()
 
         def _sync_worker_state(self) -> None:
             if self._worker is None:
                 self._last_worker_status = None
                 return
 
-            snapshot = self._worker.snapshot()
+            # Status and warnings only move on worker transitions; skip unchanged ticks.
+            snapshot = self._worker.wait_for_change(0)
+            if snapshot is None:
+                return
             if snapshot.status != self._last_worker_status:
                 if snapshot.status == "running":
                     self._set_status(f"任务运行中: {snapshot.job_id}")
@@ -295,74 +350,106 @@ if _TEXTUAL_IMPORT_ERROR is None:
             else:
                 target_db = state_db or self._state_db_from_form()
 
-            if not force and self._snapshot_service is not None and self._snapshot_db == target_db:
+            if self._snapshot_service is None or self._snapshot_db != target_db:
+                self._snapshot_db = target_db
+                self._snapshot_service = self._pooled_snapshot_service(target_db)
+                self._events_cursor = None
+            elif not force:
                 return
 
-            self._snapshot_db = target_db
-            self._snapshot_service = SnapshotService(target_db)
-            if self._selected_job_id is None and self._snapshot_service is not None:
+            # `force` only re-resolves the selection; an unchanged db keeps its service.
+            if self._selected_job_id is None:
                 self._selected_job_id = self._snapshot_service.latest_job_id()
 
-        def _refresh_job_list(self) -> None:
+        def _pooled_snapshot_service(self, state_db: Path) -> SnapshotService:
+            pool = self._snapshot_pool
+            service = pool.get(state_db)
+            if service is None:
+                service = SnapshotService(state_db)
+                pool[state_db] = service
+                while len(pool) > _SNAPSHOT_POOL_SIZE:
+                    _, evicted = pool.popitem(last=False)
+                    evicted.close()
+            else:
+                pool.move_to_end(state_db)
+            return service
+
+        def _refresh_dashboard(self) -> None:
             jobs_table = self.query_one("#jobs-table", JobsTable)
             if self._snapshot_service is None:
+                self._last_dashboard = None
                 jobs_table.set_jobs([])
+                self._show_snapshot(None)
                 return
 
             try:
-                jobs = self._snapshot_service.list_jobs(limit=50)
+                state = self._snapshot_service.get_dashboard_state(
+                    self._selected_job_id,
+                    jobs_limit=50,
+                    events_limit=EventsTable.max_events,
+                    failed_limit=50,
+                    events_since=self._events_since(self._selected_job_id),
+                )
             except Exception as exc:
+                self._last_dashboard = None
                 self._set_status(f"读取任务列表失败: {exc}")
                 jobs_table.set_jobs([])
                 return
 
-            jobs_table.set_jobs(jobs)
-            if self._selected_job_id is None and jobs:
-                self._selected_job_id = jobs[0].job_id
-
+            if state is self._last_dashboard:
+                return
+            self._last_dashboard = state
+            jobs_table.set_jobs(state.jobs)
+            if self._selected_job_id is None and state.jobs:
+                self._selected_job_id = state.jobs[0].job_id
+            self._move_jobs_cursor(jobs_table)
+            self._show_snapshot(state.snapshot)
+
+        def _move_jobs_cursor(self, jobs_table: JobsTable) -> None:
             if self._selected_job_id is None:
                 return
-            for index, job in enumerate(jobs):
-                if job.job_id == self._selected_job_id:
-                    try:
-                        jobs_table.move_cursor(row=index, column=0)
-                    except Exception:
-                        pass
-                    break
+            index = jobs_table.row_index(self._selected_job_id)
+            if index is None:
+                return
+            try:
+                jobs_table.move_cursor(row=index, column=0)
+            except Exception:
+                pass
 
         def _refresh_selected_snapshot(self) -> None:
-            stats_panel = self.query_one("#stats-panel", StatsPanel)
-            pages_table = self.query_one("#pages-table", PagesTable)
-            events_table = self.query_one("#events-table", EventsTable)
-            failed_table = self.query_one("#failed-table", FailedImagesTable)
-
+            # Panels now show a separately loaded snapshot; the next dashboard must repaint.
+            self._last_dashboard = None
             if self._snapshot_service is None:
-                stats_panel.set_snapshot(None)
-                pages_table.set_pages([])
-                events_table.set_events([])
-                failed_table.set_failed_images([])
+                self._show_snapshot(None)
                 return
 
             if self._selected_job_id is None:
                 self._selected_job_id = self._snapshot_service.latest_job_id()
             if self._selected_job_id is None:
-                stats_panel.set_snapshot(None)
-                pages_table.set_pages([])
-                events_table.set_events([])
-                failed_table.set_failed_images([])
+                self._show_snapshot(None)
                 return
 
             try:
                 snapshot = self._snapshot_service.get_snapshot(
                     self._selected_job_id,
-                    events_limit=100,
+                    events_limit=EventsTable.max_events,
                     failed_limit=50,
+                    events_since=self._events_since(self._selected_job_id),
                 )
             except Exception as exc:
                 self._set_status(f"读取任务详情失败: {exc}")
                 return
 
+            self._show_snapshot(snapshot)
+
+        def _show_snapshot(self, snapshot: JobSnapshot | None) -> None:
+            stats_panel = self.query_one("#stats-panel", StatsPanel)
+            pages_table = self.query_one("#pages-table", PagesTable)
+            events_table = self.query_one("#events-table", EventsTable)
+            failed_table = self.query_one("#failed-table", FailedImagesTable)
+
             if snapshot is None:
+                self._events_cursor = None
                 stats_panel.set_snapshot(None)
                 pages_table.set_pages([])
                 events_table.set_events([])
@@ -371,16 +458,29 @@ if _TEXTUAL_IMPORT_ERROR is None:
 
             stats_panel.set_snapshot(snapshot.stats)
             pages_table.set_pages(snapshot.pages)
-            events_table.set_events(snapshot.events)
+            if snapshot.events_appended:
+                events_table.prepend_events(snapshot.events)
+            else:
+                events_table.set_events(snapshot.events)
             failed_table.set_failed_images(snapshot.failed_images)
 
+            started_at = str(snapshot.stats.get("job", {}).get("started_at") or "")
+            last_event_id = events_table.newest_event_id() or 0
+            self._events_cursor = (snapshot.job_id, started_at, last_event_id)
+
+        def _events_since(self, job_id: str | None) -> tuple[str, int] | None:
+            cursor = self._events_cursor
+            if cursor is None or job_id is None or cursor[0] != job_id:
+                return None
+            return cursor[1], cursor[2]
+
         def _state_db_from_form(self) -> Path:
             form = self._form()
             if form is None:
-                return Path("data/state.sqlite3")
+                return _DEFAULT_STATE_DB
             state_db_text = form.state_db_path_text()
             if not state_db_text:
-                return Path("data/state.sqlite3")
+                return _DEFAULT_STATE_DB
             return Path(state_db_text)
 
         def _form(self) -> RunConfigForm | None:
@@ -389,7 +489,9 @@ if _TEXTUAL_IMPORT_ERROR is None:
             return self.query_one("#run-form", RunConfigForm)
 
         def _set_status(self, message: str) -> None:
-            self.query_one("#status-bar", Static).update(message)
+            if message != self._last_status_message:
+                self.query_one("#status-bar", Static).update(message)
+                self._last_status_message = message
             form = self._form()
             if form is not None:
                 form.set_status(message)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Mapping
 
 from ..config import build_run_config
@@ -38,6 +39,21 @@ FORM_DEFAULTS: dict[str, Any] = {
 }
 
 
+_BOOL_FIELDS = frozenset(
+    field for field, value in FORM_DEFAULTS.items() if isinstance(value, bool)
+)
+
+
+_CHECKBOX_FIELDS = tuple(field for field in FORM_DEFAULTS if field in _BOOL_FIELDS)
+_INPUT_FIELDS = tuple(
+    field for field in FORM_DEFAULTS if field not in _BOOL_FIELDS and field != "engine"
+)
+# Restoring a payload leaves these blank when missing instead of using form defaults.
+_BLANK_DEFAULT_FIELDS = frozenset(
+    {"url_template", "start_num", "end_num", "selector", "output_dir", "state_db"}
+)
+
+
 def form_defaults() -> dict[str, Any]:
     """Return mutable defaults for run form fields."""
     return dict(FORM_DEFAULTS)
@@ -79,43 +95,75 @@ def payload_from_run_config(run_config: RunConfig) -> dict[str, object]:
 
 
 def build_run_config_from_form(payload: Mapping[str, object]) -> RunConfig:
-    """Parse form payload into RunConfig with strict conversion."""
+    """Parse form payload into RunConfig with strict conversion.
+
+    Results are memoized per payload content, so resubmitting an unchanged
+    form returns the previously built RunConfig.
+    """
+    return _build_run_config_cached(_payload_key(payload))
+
+
+_PayloadKey = tuple[tuple[str, type, object], ...]
+
+
+def _payload_key(payload: Mapping[str, object]) -> _PayloadKey:
+    # Keep the value type in the key so `True` and `1` never share a cache slot.
+    items: list[tuple[str, type, object]] = []
+    for field, value in payload.items():
+        if not isinstance(value, (str, bool, int, float, type(None))):
+            value = str(value)
+        items.append((str(field), type(value), value))
+    return tuple(sorted(items))
+
+
+@lru_cache(maxsize=16)
+def _build_run_config_cached(key: _PayloadKey) -> RunConfig:
+    return _parse_form_payload({field: value for field, _, value in key})
+
+
+def _parse_form_payload(payload: Mapping[str, object]) -> RunConfig:
+    # Coerce and strip every text field once; bool fields keep their raw values.
+    cleaned = {
+        field: str(payload.get(field, "")).strip()
+        for field in FORM_DEFAULTS
+        if field not in _BOOL_FIELDS
+    }
     raw: dict[str, Any] = {}
 
-    raw["url_template"] = _required_text(payload, "url_template", "url_template")
-    raw["start_num"] = _required_int(payload, "start_num", "start_num")
-    raw["end_num"] = _optional_int(payload, "end_num", "end_num")
-    raw["selector"] = _text_or_default(payload, "selector", str(FORM_DEFAULTS["selector"]))
-    raw["output_dir"] = _text_or_default(payload, "output_dir", str(FORM_DEFAULTS["output_dir"]))
-    raw["state_db"] = _text_or_default(payload, "state_db", str(FORM_DEFAULTS["state_db"]))
-    raw["engine"] = _text_or_default(payload, "engine", str(FORM_DEFAULTS["engine"])).lower()
+    raw["url_template"] = _required_text(cleaned, "url_template", "url_template")
+    raw["start_num"] = _required_int(cleaned, "start_num", "start_num")
+    raw["end_num"] = _optional_int(cleaned, "end_num", "end_num")
+    raw["selector"] = _text_or_default(cleaned, "selector", str(FORM_DEFAULTS["selector"]))
+    raw["output_dir"] = _text_or_default(cleaned, "output_dir", str(FORM_DEFAULTS["output_dir"]))
+    raw["state_db"] = _text_or_default(cleaned, "state_db", str(FORM_DEFAULTS["state_db"]))
+    raw["engine"] = _text_or_default(cleaned, "engine", str(FORM_DEFAULTS["engine"])).lower()
     raw["resume"] = _bool_or_default(payload, "resume", bool(FORM_DEFAULTS["resume"]))
-    raw["page_timeout_sec"] = _required_float(payload, "page_timeout_sec", "page_timeout_sec")
-    raw["image_timeout_sec"] = _required_float(payload, "image_timeout_sec", "image_timeout_sec")
-    raw["image_retries"] = _required_int(payload, "image_retries", "image_retries")
-    raw["page_retries"] = _required_int(payload, "page_retries", "page_retries")
-    raw["request_delay_sec"] = _required_float(payload, "request_delay_sec", "request_delay_sec")
-    raw["page_workers"] = _required_int(payload, "page_workers", "page_workers")
-    raw["image_workers"] = _required_int(payload, "image_workers", "image_workers")
+    raw["page_timeout_sec"] = _required_float(cleaned, "page_timeout_sec", "page_timeout_sec")
+    raw["image_timeout_sec"] = _required_float(cleaned, "image_timeout_sec", "image_timeout_sec")
+    raw["image_retries"] = _required_int(cleaned, "image_retries", "image_retries")
+    raw["page_retries"] = _required_int(cleaned, "page_retries", "page_retries")
+    raw["request_delay_sec"] = _required_float(cleaned, "request_delay_sec", "request_delay_sec")
+    raw["page_workers"] = _required_int(cleaned, "page_workers", "page_workers")
+    raw["image_workers"] = _required_int(cleaned, "image_workers", "image_workers")
     raw["max_requests_per_sec"] = _required_float(
-        payload,
+        cleaned,
         "max_requests_per_sec",
         "max_requests_per_sec",
     )
-    raw["max_burst"] = _required_int(payload, "max_burst", "max_burst")
+    raw["max_burst"] = _required_int(cleaned, "max_burst", "max_burst")
     raw["backoff_base_sec"] = _required_float(
-        payload,
+        cleaned,
         "backoff_base_sec",
         "backoff_base_sec",
     )
     raw["backoff_max_sec"] = _required_float(
-        payload,
+        cleaned,
         "backoff_max_sec",
         "backoff_max_sec",
     )
-    raw["db_batch_size"] = _required_int(payload, "db_batch_size", "db_batch_size")
+    raw["db_batch_size"] = _required_int(cleaned, "db_batch_size", "db_batch_size")
     raw["db_flush_interval_ms"] = _required_int(
-        payload,
+        cleaned,
         "db_flush_interval_ms",
         "db_flush_interval_ms",
     )
@@ -125,7 +173,7 @@ def build_run_config_from_form(payload: Mapping[str, object]) -> RunConfig:
         bool(FORM_DEFAULTS["continue_on_image_failure"]),
     )
     raw["stop_after_consecutive_page_failures"] = _required_int(
-        payload,
+        cleaned,
         "stop_after_consecutive_page_failures",
         "stop_after_consecutive_page_failures",
     )
@@ -135,7 +183,7 @@ def build_run_config_from_form(payload: Mapping[str, object]) -> RunConfig:
         bool(FORM_DEFAULTS["playwright_fallback"]),
     )
     raw["sequence_count_selector"] = _text_or_default(
-        payload,
+        cleaned,
         "sequence_count_selector",
         str(FORM_DEFAULTS["sequence_count_selector"]),
     )
@@ -152,20 +200,19 @@ def build_run_config_from_form(payload: Mapping[str, object]) -> RunConfig:
     return build_run_config(raw)
 
 
-def _required_text(payload: Mapping[str, object], field: str, label: str) -> str:
-    value = str(payload.get(field, "")).strip()
+def _required_text(cleaned: Mapping[str, str], field: str, label: str) -> str:
+    value = cleaned[field]
     if not value:
         raise ValueError(f"{label} 不能为空。")
     return value
 
 
-def _text_or_default(payload: Mapping[str, object], field: str, default: str) -> str:
-    value = str(payload.get(field, "")).strip()
-    return value or default
+def _text_or_default(cleaned: Mapping[str, str], field: str, default: str) -> str:
+    return cleaned[field] or default
 
 
-def _required_int(payload: Mapping[str, object], field: str, label: str) -> int:
-    raw = str(payload.get(field, "")).strip()
+def _required_int(cleaned: Mapping[str, str], field: str, label: str) -> int:
+    raw = cleaned[field]
     if not raw:
         raise ValueError(f"{label} 不能为空。")
     try:
@@ -174,8 +221,8 @@ def _required_int(payload: Mapping[str, object], field: str, label: str) -> int:
         raise ValueError(f"{label} 必须是整数。") from exc
 
 
-def _optional_int(payload: Mapping[str, object], field: str, label: str) -> int | None:
-    raw = str(payload.get(field, "")).strip()
+def _optional_int(cleaned: Mapping[str, str], field: str, label: str) -> int | None:
+    raw = cleaned[field]
     if not raw:
         return None
     try:
@@ -184,8 +231,8 @@ def _optional_int(payload: Mapping[str, object], field: str, label: str) -> int
         raise ValueError(f"{label} 必须是整数。") from exc
 
 
-def _required_float(payload: Mapping[str, object], field: str, label: str) -> float:
-    raw = str(payload.get(field, "")).strip()
+def _required_float(cleaned: Mapping[str, str], field: str, label: str) -> float:
+    raw = cleaned[field]
     if not raw:
         raise ValueError(f"{label} 不能为空。")
     try:
@@ -227,6 +274,9 @@ try:  # pragma: no cover - UI class is covered by manual interaction
     class RunConfigForm(VerticalScroll):
         """Left-side full RunConfig form."""
 
+        _status_text = ""
+        _error_text = ""
+
         def compose(self) -> ComposeResult:
             defaults = form_defaults()
             yield Label("运行参数", classes="section-title")
@@ -316,141 +366,53 @@ try:  # pragma: no cover - UI class is covered by manual interaction
             yield Static("", id="run-form-status")
             yield Static("", id="run-form-error")
 
-        def get_payload(self) -> dict[str, object]:
-            engine_widget = self.query_one("#engine", Select)
-            engine_value = engine_widget.value
-            engine = "" if engine_value == Select.BLANK else str(engine_value)
-            return {
-                "url_template": self.query_one("#url_template", Input).value,
-                "start_num": self.query_one("#start_num", Input).value,
-                "end_num": self.query_one("#end_num", Input).value,
-                "selector": self.query_one("#selector", Input).value,
-                "output_dir": self.query_one("#output_dir", Input).value,
-                "state_db": self.query_one("#state_db", Input).value,
-                "engine": engine,
-                "resume": self.query_one("#resume", Checkbox).value,
-                "page_timeout_sec": self.query_one("#page_timeout_sec", Input).value,
-                "image_timeout_sec": self.query_one("#image_timeout_sec", Input).value,
-                "image_retries": self.query_one("#image_retries", Input).value,
-                "page_retries": self.query_one("#page_retries", Input).value,
-                "request_delay_sec": self.query_one("#request_delay_sec", Input).value,
-                "page_workers": self.query_one("#page_workers", Input).value,
-                "image_workers": self.query_one("#image_workers", Input).value,
-                "max_requests_per_sec": self.query_one("#max_requests_per_sec", Input).value,
-                "max_burst": self.query_one("#max_burst", Input).value,
-                "backoff_base_sec": self.query_one("#backoff_base_sec", Input).value,
-                "backoff_max_sec": self.query_one("#backoff_max_sec", Input).value,
-                "db_batch_size": self.query_one("#db_batch_size", Input).value,
-                "db_flush_interval_ms": self.query_one("#db_flush_interval_ms", Input).value,
-                "continue_on_image_failure": self.query_one(
-                    "#continue_on_image_failure",
-                    Checkbox,
-                ).value,
-                "stop_after_consecutive_page_failures": self.query_one(
-                    "#stop_after_consecutive_page_failures",
-                    Input,
-                ).value,
-                "playwright_fallback": self.query_one("#playwright_fallback", Checkbox).value,
-                "sequence_count_selector": self.query_one("#sequence_count_selector", Input).value,
-                "sequence_require_upper_bound": self.query_one(
-                    "#sequence_require_upper_bound",
-                    Checkbox,
-                ).value,
-                "sequence_probe_after_upper_bound": self.query_one(
-                    "#sequence_probe_after_upper_bound",
-                    Checkbox,
-                ).value,
+        def on_mount(self) -> None:
+            # Field widgets are fixed by `compose`; resolve them once instead of per access.
+            self._inputs = {field: self.query_one(f"#{field}", Input) for field in _INPUT_FIELDS}
+            self._checkboxes = {
+                field: self.query_one(f"#{field}", Checkbox) for field in _CHECKBOX_FIELDS
             }
+            self._engine_select = self.query_one("#engine", Select)
+
+        def get_payload(self) -> dict[str, object]:
+            engine_value = self._engine_select.value
+            payload: dict[str, object] = {}
+            for field in FORM_DEFAULTS:
+                if field == "engine":
+                    payload[field] = "" if engine_value == Select.BLANK else str(engine_value)
+                elif field in _BOOL_FIELDS:
+                    payload[field] = self._checkboxes[field].value
+                else:
+                    payload[field] = self._inputs[field].value
+            return payload
 
         def set_payload(self, payload: Mapping[str, object]) -> None:
-            self.query_one("#url_template", Input).value = str(payload.get("url_template", ""))
-            self.query_one("#start_num", Input).value = str(payload.get("start_num", ""))
-            self.query_one("#end_num", Input).value = str(payload.get("end_num", ""))
-            self.query_one("#selector", Input).value = str(payload.get("selector", ""))
-            self.query_one("#output_dir", Input).value = str(payload.get("output_dir", ""))
-            self.query_one("#state_db", Input).value = str(payload.get("state_db", ""))
-
-            engine_widget = self.query_one("#engine", Select)
-            engine_raw = str(payload.get("engine", FORM_DEFAULTS["engine"])).lower()
-            engine = engine_raw if engine_raw in {"requests", "playwright"} else "requests"
-            engine_widget.value = engine
-
-            self.query_one("#resume", Checkbox).value = _coerce_bool(
-                payload.get("resume"),
-                bool(FORM_DEFAULTS["resume"]),
-            )
-            self.query_one("#page_timeout_sec", Input).value = str(
-                payload.get("page_timeout_sec", FORM_DEFAULTS["page_timeout_sec"])
-            )
-            self.query_one("#image_timeout_sec", Input).value = str(
-                payload.get("image_timeout_sec", FORM_DEFAULTS["image_timeout_sec"])
-            )
-            self.query_one("#image_retries", Input).value = str(
-                payload.get("image_retries", FORM_DEFAULTS["image_retries"])
-            )
-            self.query_one("#page_retries", Input).value = str(
-                payload.get("page_retries", FORM_DEFAULTS["page_retries"])
-            )
-            self.query_one("#request_delay_sec", Input).value = str(
-                payload.get("request_delay_sec", FORM_DEFAULTS["request_delay_sec"])
-            )
-            self.query_one("#page_workers", Input).value = str(
-                payload.get("page_workers", FORM_DEFAULTS["page_workers"])
-            )
-            self.query_one("#image_workers", Input).value = str(
-                payload.get("image_workers", FORM_DEFAULTS["image_workers"])
-            )
-            self.query_one("#max_requests_per_sec", Input).value = str(
-                payload.get("max_requests_per_sec", FORM_DEFAULTS["max_requests_per_sec"])
-            )
-            self.query_one("#max_burst", Input).value = str(
-                payload.get("max_burst", FORM_DEFAULTS["max_burst"])
-            )
-            self.query_one("#backoff_base_sec", Input).value = str(
-                payload.get("backoff_base_sec", FORM_DEFAULTS["backoff_base_sec"])
-            )
-            self.query_one("#backoff_max_sec", Input).value = str(
-                payload.get("backoff_max_sec", FORM_DEFAULTS["backoff_max_sec"])
-            )
-            self.query_one("#db_batch_size", Input).value = str(
-                payload.get("db_batch_size", FORM_DEFAULTS["db_batch_size"])
-            )
-            self.query_one("#db_flush_interval_ms", Input).value = str(
-                payload.get("db_flush_interval_ms", FORM_DEFAULTS["db_flush_interval_ms"])
-            )
-            self.query_one("#continue_on_image_failure", Checkbox).value = _coerce_bool(
-                payload.get("continue_on_image_failure"),
-                bool(FORM_DEFAULTS["continue_on_image_failure"]),
-            )
-            self.query_one("#stop_after_consecutive_page_failures", Input).value = str(
-                payload.get(
-                    "stop_after_consecutive_page_failures",
-                    FORM_DEFAULTS["stop_after_consecutive_page_failures"],
-                )
-            )
-            self.query_one("#playwright_fallback", Checkbox).value = _coerce_bool(
-                payload.get("playwright_fallback"),
-                bool(FORM_DEFAULTS["playwright_fallback"]),
-            )
-            self.query_one("#sequence_count_selector", Input).value = str(
-                payload.get("sequence_count_selector", FORM_DEFAULTS["sequence_count_selector"])
-            )
-            self.query_one("#sequence_require_upper_bound", Checkbox).value = _coerce_bool(
-                payload.get("sequence_require_upper_bound"),
-                bool(FORM_DEFAULTS["sequence_require_upper_bound"]),
-            )
-            self.query_one("#sequence_probe_after_upper_bound", Checkbox).value = _coerce_bool(
-                payload.get("sequence_probe_after_upper_bound"),
-                bool(FORM_DEFAULTS["sequence_probe_after_upper_bound"]),
-            )
+            # Apply all field writes as one repaint instead of one per widget.
+            with self.app.batch_update():
+                for field, widget in self._inputs.items():
+                    default = "" if field in _BLANK_DEFAULT_FIELDS else FORM_DEFAULTS[field]
+                    widget.value = str(payload.get(field, default))
+
+                engine_raw = str(payload.get("engine", FORM_DEFAULTS["engine"])).lower()
+                engine = engine_raw if engine_raw in {"requests", "playwright"} else "requests"
+                self._engine_select.value = engine
+
+                for field, checkbox in self._checkboxes.items():
+                    checkbox.value = _coerce_bool(payload.get(field), bool(FORM_DEFAULTS[field]))
 
         def state_db_path_text(self) -> str:
-            return self.query_one("#state_db", Input).value.strip()
+            return self._inputs["state_db"].value.strip()
 
         def set_error(self, message: str) -> None:
+            if message == self._error_text:
+                return
+            self._error_text = message
             self.query_one("#run-form-error", Static).update(message)
 
         def set_status(self, message: str) -> None:
+            if message == self._status_text:
+                return
+            self._status_text = message
             self.query_one("#run-form-status", Static).update(message)
 
 
@@ -2,55 +2,75 @@
 
 from __future__ import annotations
 
-import copy
-import json
+import sqlite3
 import threading
-from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, Iterator
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Sequence
 
-from ..config import build_run_config, compute_job_id, run_config_json
-from ..fetchers import PlaywrightFetcher, RequestsFetcher
+from ..config import build_run_config, compute_job_id, parse_json, run_config_json
+from ..fetchers import RequestsFetcher
 from ..fetchers.base import BaseFetcher
 from ..models import JobState, PageState, RunConfig, utc_now_iso
 from ..pipeline import ImageHarvesterPipeline
 from ..state import StateStore
 
 
-FetcherBuilder = Callable[[RunConfig], tuple[BaseFetcher, BaseFetcher | None, list[str]]]
+FetcherBuilder = Callable[[RunConfig], tuple[BaseFetcher, BaseFetcher | None, Sequence[str]]]
 
+_NO_WARNINGS: tuple[str, ...] = ()
 
-def build_fetchers_for_config(
+
+def _build_requests_fetchers(
     run_config: RunConfig,
-) -> tuple[BaseFetcher, BaseFetcher | None, list[str]]:
-    """Create primary/fallback fetchers for a run config."""
-    warnings: list[str] = []
-    if run_config.engine == "requests":
-        primary: BaseFetcher = RequestsFetcher()
-        fallback: BaseFetcher | None = None
-        if run_config.playwright_fallback:
-            try:
-                fallback = PlaywrightFetcher()
-            except RuntimeError as exc:
-                warnings.append(f"Playwright 回退已禁用: {exc}")
-        return primary, fallback, warnings
+) -> tuple[BaseFetcher, BaseFetcher | None, Sequence[str]]:
+    primary = RequestsFetcher()
+    if not run_config.playwright_fallback:
+        return primary, None, _NO_WARNINGS
 
-    if run_config.engine == "playwright":
-        return PlaywrightFetcher(), None, warnings
+    from ..fetchers.playwright_fetcher import PlaywrightFetcher
 
-    raise ValueError(f"不支持的引擎: {run_config.engine}")
+    try:
+        return primary, PlaywrightFetcher(), _NO_WARNINGS
+    except RuntimeError as exc:
+        return primary, None, (f"Playwright 回退已禁用: {exc}",)
 
 
-@dataclass(slots=True)
+def _build_playwright_fetchers(
+    run_config: RunConfig,
+) -> tuple[BaseFetcher, BaseFetcher | None, Sequence[str]]:
+    from ..fetchers.playwright_fetcher import PlaywrightFetcher
+
+    return PlaywrightFetcher(), None, _NO_WARNINGS
+
+
+_ENGINE_BUILDERS: dict[str, FetcherBuilder] = {
+    "requests": _build_requests_fetchers,
+    "playwright": _build_playwright_fetchers,
+}
+
+
+def build_fetchers_for_config(
+    run_config: RunConfig,
+) -> tuple[BaseFetcher, BaseFetcher | None, Sequence[str]]:
+    """Create primary/fallback fetchers for a run config."""
+    builder = _ENGINE_BUILDERS.get(run_config.engine)
+    if builder is None:
+        raise ValueError(f"不支持的引擎: {run_config.engine}")
+    return builder(run_config)
+
+
+@dataclass(slots=True, frozen=True)
 class WorkerSnapshot:
     """Public worker state for UI polling."""
 
     job_id: str
     status: str
     error: str | None
-    summary: dict[str, Any] | None
-    warnings: list[str]
+    summary: Mapping[str, Any] | None
+    warnings: tuple[str, ...]
     started_at: str | None
     finished_at: str | None
 
@@ -64,31 +84,44 @@ class RunWorker:
         *,
         fetcher_builder: FetcherBuilder = build_fetchers_for_config,
         downloader: Any | None = None,
+        on_state_change: Callable[[], None] | None = None,
     ) -> None:
         self.run_config = run_config
         self.job_id = compute_job_id(run_config)
+        self._config_json = run_config_json(run_config)
         self._fetcher_builder = fetcher_builder
         self._downloader = downloader
+        self._on_state_change = on_state_change
         self._thread: threading.Thread | None = None
+        # Guards only the start check; afterwards the runner thread is the single writer.
         self._lock = threading.Lock()
-        self._status = "idle"
-        self._error: str | None = None
-        self._summary: dict[str, Any] | None = None
-        self._warnings: list[str] = []
-        self._started_at: str | None = None
-        self._finished_at: str | None = None
+        # Whole state is republished as one immutable snapshot; readers never lock.
+        self._state = WorkerSnapshot(
+            job_id=self.job_id,
+            status="idle",
+            error=None,
+            summary=None,
+            warnings=(),
+            started_at=None,
+            finished_at=None,
+        )
+        self._changed = threading.Event()
 
     def start(self) -> None:
         """Start worker once. Raises if already running."""
         with self._lock:
             if self._thread is not None and self._thread.is_alive():
                 raise RuntimeError("已有任务在运行中。")
-            self._status = "running"
-            self._error = None
-            self._summary = None
-            self._warnings = []
-            self._started_at = utc_now_iso()
-            self._finished_at = None
+            self._state = replace(
+                self._state,
+                status="running",
+                error=None,
+                summary=None,
+                warnings=(),
+                started_at=utc_now_iso(),
+                finished_at=None,
+            )
+        self._changed.set()
 
         self._thread = threading.Thread(
             target=self._run,
@@ -112,25 +145,28 @@ class RunWorker:
 
     def snapshot(self) -> WorkerSnapshot:
         """Get thread-safe state snapshot for UI."""
-        with self._lock:
-            summary = copy.deepcopy(self._summary)
-            warnings = list(self._warnings)
-            return WorkerSnapshot(
-                job_id=self.job_id,
-                status=self._status,
-                error=self._error,
-                summary=summary,
-                warnings=warnings,
-                started_at=self._started_at,
-                finished_at=self._finished_at,
-            )
+        return self._state
+
+    def wait_for_change(self, timeout: float | None = None) -> WorkerSnapshot | None:
+        """Return latest snapshot once state changed since the last call, else None.
+
+        Meant for a single consumer; `timeout=0` checks without blocking.
+        """
+        if not self._changed.wait(timeout):
+            return None
+        self._changed.clear()
+        return self._state
 
     def _run(self) -> None:
         store = StateStore(self.run_config.state_db)
         try:
             fetcher, fallback_fetcher, warnings = self._fetcher_builder(self.run_config)
-            with self._lock:
-                self._warnings.extend(warnings)
+            if warnings:
+                state = self._state
+                # Ordered de-dup: a repeated warning is shown once.
+                merged = tuple(dict.fromkeys((*state.warnings, *warnings)))
+                self._state = replace(state, warnings=merged)
+                self._notify_state_change()
 
             pipeline = ImageHarvesterPipeline(
                 config=self.run_config,
@@ -139,20 +175,60 @@ class RunWorker:
                 downloader=self._downloader,
                 fallback_fetcher=fallback_fetcher,
             )
-            summary = pipeline.run(job_id=self.job_id, config_json=run_config_json(self.run_config))
+            summary = pipeline.run(job_id=self.job_id, config_json=self._config_json)
         except Exception as exc:
-            with self._lock:
-                self._status = "failed"
-                self._error = str(exc)
-                self._finished_at = utc_now_iso()
+            self._state = replace(
+                self._state,
+                status="failed",
+                error=str(exc),
+                finished_at=utc_now_iso(),
+            )
+            self._notify_state_change()
             return
         finally:
             store.close()
 
-        with self._lock:
-            self._status = "completed"
-            self._summary = summary
-            self._finished_at = utc_now_iso()
+        self._state = replace(
+            self._state,
+            status="completed",
+            summary=_freeze(summary),
+            finished_at=utc_now_iso(),
+        )
+        self._notify_state_change()
+
+    def _notify_state_change(self) -> None:
+        """Flag the change and invoke the callback from the runner thread."""
+        self._changed.set()
+        if self._on_state_change is None:
+            return
+        try:
+            self._on_state_change()
+        except Exception as exc:
+            # Surface the failure through the snapshot; the poller still sees it.
+            state = self._state
+            warning = f"状态回调失败: {exc}"
+            self._state = replace(state, warnings=tuple(dict.fromkeys((*state.warnings, warning))))
+            self._changed.set()
+
+
+@lru_cache(maxsize=128)
+def _run_config_from_json(config_json: str, state_db: Path) -> RunConfig | None:
+    """Parse persisted job config; keyed on the JSON text since job rows can be rewritten."""
+    try:
+        payload = parse_json(config_json)
+        # Non-object JSON fails the `**` unpacking and lands in the same handler.
+        return build_run_config({**payload, "state_db": payload.get("state_db") or str(state_db)})
+    except Exception:
+        return None
+
+
+def _freeze(value: Any) -> Any:
+    """Return a read-only view of nested dict/list data."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 
 @dataclass(slots=True)
@@ -161,9 +237,18 @@ class JobSnapshot:
 
     job_id: str
     stats: dict[str, Any]
-    events: list[dict[str, Any]]
-    failed_images: list[dict[str, Any]]
+    events: list[sqlite3.Row]
+    failed_images: list[sqlite3.Row]
     pages: list[PageState]
+    events_appended: bool = False
+
+
+@dataclass(slots=True)
+class DashboardState:
+    """Job list plus selected-job snapshot read in one transaction."""
+
+    jobs: list[JobState]
+    snapshot: JobSnapshot | None
 
 
 class SnapshotService:
@@ -171,27 +256,49 @@ class SnapshotService:
 
     def __init__(self, state_db: Path) -> None:
         self.state_db = state_db
-
-    @contextmanager
-    def _store(self) -> Iterator[StateStore]:
-        store = StateStore(self.state_db)
-        try:
-            yield store
-        finally:
+        # One long-lived connection per polling thread; all are closed by `close()`.
+        self._local = threading.local()
+        self._stores: list[StateStore] = []
+        self._stores_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close every connection opened by this service."""
+        with self._stores_lock:
+            stores, self._stores = self._stores, []
+            self._local = threading.local()
+        for store in stores:
             store.close()
 
+    def _store(self) -> StateStore:
+        store = getattr(self._local, "store", None)
+        if store is None:
+            store = StateStore(self.state_db)
+            with self._stores_lock:
+                self._stores.append(store)
+                self._local.store = store
+        return store
+
+    def _read_cached(self, key: tuple[Any, ...], load: Callable[[StateStore], Any]) -> Any:
+        """Return the previous result for `key` while no other connection has committed."""
+        store = self._store()
+        version = store.data_version()
+        cached = getattr(self._local, "cached", None)
+        if cached is not None and cached[0] == key and cached[1] == version:
+            return cached[2]
+        result = load(store)
+        self._local.cached = (key, version, result)
+        return result
+
     def list_jobs(self, *, limit: int = 50) -> list[JobState]:
         """List latest jobs with optional limit."""
-        with self._store() as store:
-            jobs = store.list_jobs()
+        jobs = self._store().list_jobs()
         if limit < 1:
             return []
         return jobs[:limit]
 
     def latest_job(self) -> JobState | None:
         """Return latest job record."""
-        with self._store() as store:
-            return store.get_latest_job()
+        return self._store().get_latest_job()
 
     def latest_job_id(self) -> str | None:
         """Return latest job id or None."""
@@ -205,26 +312,10 @@ class SnapshotService:
         fallback_state_db: Path | None = None,
     ) -> RunConfig | None:
         """Parse RunConfig from persisted job config JSON."""
-        with self._store() as store:
-            job = store.get_job(job_id)
+        job = self._store().get_job(job_id)
         if job is None:
             return None
-
-        try:
-            payload = json.loads(job.config_json)
-        except Exception:
-            return None
-        if not isinstance(payload, dict):
-            return None
-
-        state_db = fallback_state_db or self.state_db
-        if not payload.get("state_db"):
-            payload["state_db"] = str(state_db)
-
-        try:
-            return build_run_config(payload)
-        except Exception:
-            return None
+        return _run_config_from_json(job.config_json, fallback_state_db or self.state_db)
 
     def get_snapshot(
         self,
@@ -232,23 +323,108 @@ class SnapshotService:
         *,
         events_limit: int = 100,
         failed_limit: int = 50,
+        pages_limit: int = 200,
+        events_since: tuple[str, int] | None = None,
     ) -> JobSnapshot | None:
-        """Load a full read-model snapshot for one job."""
-        with self._store() as store:
-            if store.get_job(job_id) is None:
-                return None
+        """Load a full read-model snapshot for one job.
+
+        `events_since` is `(job started_at, last seen event id)`. When the job
+        run still matches, only newer events are returned and the snapshot
+        is flagged with `events_appended=True`; when `events_limit` or more
+        arrived, the newest events are returned unflagged as a full reload.
+        An unchanged database returns the previous snapshot object for
+        identical arguments.
+        """
+
+        def load(store: StateStore) -> JobSnapshot | None:
+            with store.read_transaction():
+                return self._load_snapshot(
+                    store,
+                    job_id,
+                    events_limit=events_limit,
+                    failed_limit=failed_limit,
+                    pages_limit=pages_limit,
+                    events_since=events_since,
+                )
+
+        key = ("snapshot", job_id, events_limit, failed_limit, pages_limit, events_since)
+        return self._read_cached(key, load)
+
+    def get_dashboard_state(
+        self,
+        selected_job_id: str | None,
+        *,
+        jobs_limit: int = 50,
+        events_limit: int = 100,
+        failed_limit: int = 50,
+        pages_limit: int = 200,
+        events_since: tuple[str, int] | None = None,
+    ) -> DashboardState:
+        """Load job list and selected-job snapshot in one read transaction.
+
+        When `selected_job_id` is None the newest listed job is used;
+        `events_since` and result reuse behave as in `get_snapshot`.
+        """
+
+        def load(store: StateStore) -> DashboardState:
+            with store.read_transaction():
+                jobs = store.list_jobs()[:jobs_limit] if jobs_limit >= 1 else []
+                job_id = selected_job_id
+                if job_id is None and jobs:
+                    job_id = jobs[0].job_id
+                snapshot = None
+                if job_id is not None:
+                    snapshot = self._load_snapshot(
+                        store,
+                        job_id,
+                        events_limit=events_limit,
+                        failed_limit=failed_limit,
+                        pages_limit=pages_limit,
+                        events_since=events_since,
+                    )
+            return DashboardState(jobs=jobs, snapshot=snapshot)
+
+        key = (
+            "dashboard",
+            selected_job_id,
+            jobs_limit,
+            events_limit,
+            failed_limit,
+            pages_limit,
+            events_since,
+        )
+        return self._read_cached(key, load)
+
+    @staticmethod
+    def _load_snapshot(
+        store: StateStore,
+        job_id: str,
+        *,
+        events_limit: int,
+        failed_limit: int,
+        pages_limit: int,
+        events_since: tuple[str, int] | None,
+    ) -> JobSnapshot | None:
+        try:
             stats = store.stats_for_job(job_id)
-            events = store.list_events(job_id, limit=events_limit)
-            failed = store.get_failed_images(job_id, limit=failed_limit)
-            pages = sorted(
-                store.list_pages(job_id),
-                key=lambda page: (page.updated_at or "", page.page_num),
-                reverse=True,
-            )
+        except ValueError:
+            return None
+        # Events are append-only within one job run; a reset run restarts them.
+        after_id: int | None = None
+        if events_since is not None and events_since[0] == stats["job"]["started_at"]:
+            after_id = events_since[1]
+        events = store.list_events(job_id, limit=events_limit, after_id=after_id)
+        if after_id is not None and len(events) >= events_limit:
+            # A full batch may hide older unseen events; it is already the newest
+            # page, so hand it back as a replacement instead of a gapped prepend.
+            after_id = None
+        failed = store.get_failed_images(job_id, limit=failed_limit)
+        pages = store.list_pages_for_display(job_id, limit=pages_limit)
         return JobSnapshot(
             job_id=job_id,
             stats=stats,
             events=events,
             failed_images=failed,
             pages=pages,
+            events_appended=after_id is not None,
         )
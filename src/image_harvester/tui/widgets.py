@@ -2,19 +2,25 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+import sqlite3
+from functools import lru_cache
+from typing import Any, ClassVar, Sequence
 
 from textual.widgets import DataTable, Static
+from textual.widgets.data_table import ColumnKey
 
 from ..models import JobState, PageState
 
 
+# Formatters are pure and see the same cell text on every refresh tick.
+@lru_cache(maxsize=4096)
 def _fmt_ts(value: str | None) -> str:
     if not value:
         return "-"
     return value[:19].replace("T", " ")
 
 
+@lru_cache(maxsize=8192)
 def _short(text: str | None, limit: int) -> str:
     if not text:
         return "-"
@@ -34,107 +40,158 @@ class StatsPanel(Static):
         job = stats.get("job", {})
         pages = stats.get("pages", {})
         images = stats.get("images", {})
-        lines = [
-            f"任务: {job.get('job_id', '-')}",
-            f"状态: {job.get('status', '-')}",
-            f"开始: {_fmt_ts(job.get('started_at'))}",
-            f"结束: {_fmt_ts(job.get('finished_at'))}",
-            (
-                "页面: total={total} done={done} failed={failed} empty={empty}".format(
-                    total=pages.get("total_pages", 0),
-                    done=pages.get("done_pages", 0),
-                    failed=pages.get("failed_pages", 0),
-                    empty=pages.get("empty_pages", 0),
-                )
-            ),
-            (
-                "图片: total={total} ok={ok} failed={failed} remaining={remaining}".format(
-                    total=images.get("total_images", 0),
-                    ok=images.get("completed_images", 0),
-                    failed=images.get("failed_images", 0),
-                    remaining=images.get("remaining_images", 0),
-                )
-            ),
-        ]
-        self.update("\n".join(lines))
+        self.update(
+            f"任务: {job.get('job_id', '-')}\n"
+            f"状态: {job.get('status', '-')}\n"
+            f"开始: {_fmt_ts(job.get('started_at'))}\n"
+            f"结束: {_fmt_ts(job.get('finished_at'))}\n"
+            f"页面: total={pages.get('total_pages', 0)} done={pages.get('done_pages', 0)} "
+            f"failed={pages.get('failed_pages', 0)} empty={pages.get('empty_pages', 0)}\n"
+            f"图片: total={images.get('total_images', 0)} ok={images.get('completed_images', 0)} "
+            f"failed={images.get('failed_images', 0)} "
+            f"remaining={images.get('remaining_images', 0)}"
+        )
 
 
-class JobsTable(DataTable):
-    """Recent jobs list table."""
+class _SyncedTable(DataTable):
+    """DataTable that only touches rows whose cells changed since the last sync."""
+
+    COLUMNS: ClassVar[tuple[str, ...]] = ()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._column_keys: list[ColumnKey] = []
+        self._rows: dict[str, tuple[str, ...]] = {}
 
     def on_mount(self) -> None:
         self.cursor_type = "row"
         self.zebra_stripes = True
-        self.add_columns("job_id", "status", "started_at", "finished_at")
+        # A remounted table keeps its columns; only add them the first time.
+        if not self.columns:
+            self._column_keys = self.add_columns(*self.COLUMNS)
+
+    def _sync_rows(self, rows: Sequence[tuple[str, tuple[str, ...]]]) -> None:
+        """Apply `(row_key, cells)` rows; same keys in same order update cells in place."""
+        if list(self._rows) != [key for key, _ in rows]:
+            self.clear(columns=False)
+            for key, cells in rows:
+                self.add_row(*cells, key=key)
+        else:
+            for key, cells in rows:
+                previous = self._rows[key]
+                if cells == previous:
+                    continue
+                for column_key, old, new in zip(self._column_keys, previous, cells):
+                    if old != new:
+                        # Auto-width columns only grow when asked to re-measure.
+                        self.update_cell(key, column_key, new, update_width=True)
+        self._rows = dict(rows)
+
+
+class JobsTable(_SyncedTable):
+    """Recent jobs list table."""
+
+    COLUMNS = ("job_id", "status", "started_at", "finished_at")
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._row_index: dict[str, int] = {}
 
     def set_jobs(self, jobs: Sequence[JobState]) -> None:
-        self.clear(columns=False)
-        for job in jobs:
-            self.add_row(
-                job.job_id,
-                job.status,
-                _fmt_ts(job.started_at),
-                _fmt_ts(job.finished_at),
-                key=job.job_id,
-            )
-
-
-class PagesTable(DataTable):
+        self._row_index = {job.job_id: index for index, job in enumerate(jobs)}
+        self._sync_rows(
+            [
+                (
+                    job.job_id,
+                    (job.job_id, job.status, _fmt_ts(job.started_at), _fmt_ts(job.finished_at)),
+                )
+                for job in jobs
+            ]
+        )
+
+    def row_index(self, job_id: str) -> int | None:
+        """Return row position of a job from the last `set_jobs` call."""
+        return self._row_index.get(job_id)
+
+
+class PagesTable(_SyncedTable):
     """Per-page status summary table."""
 
-    def on_mount(self) -> None:
-        self.cursor_type = "row"
-        self.zebra_stripes = True
-        self.add_columns("page", "status", "progress", "error")
+    COLUMNS = ("page", "status", "progress", "error")
 
     def set_pages(self, pages: Sequence[PageState]) -> None:
-        self.clear(columns=False)
-        for page in pages:
-            progress = f"{page.last_completed_image_index}/{page.image_count}"
-            self.add_row(
-                str(page.page_num),
-                page.status,
-                progress,
-                _short(page.error, 60),
-                key=f"page-{page.id}",
-            )
-
-
-class EventsTable(DataTable):
+        self._sync_rows(
+            [
+                (
+                    f"page-{page.id}",
+                    (
+                        str(page.page_num),
+                        page.status,
+                        f"{page.last_completed_image_index}/{page.image_count}",
+                        _short(page.error, 60),
+                    ),
+                )
+                for page in pages
+            ]
+        )
+
+
+class EventsTable(_SyncedTable):
     """Recent events for selected job."""
 
-    def on_mount(self) -> None:
-        self.cursor_type = "row"
-        self.zebra_stripes = True
-        self.add_columns("time", "event", "page_id", "message")
+    COLUMNS = ("time", "event", "page_id", "message")
+    max_events = 500
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._events: list[sqlite3.Row] = []
 
-    def set_events(self, events: Sequence[dict]) -> None:
-        self.clear(columns=False)
-        for item in events:
-            self.add_row(
-                _fmt_ts(str(item.get("created_at", ""))),
-                str(item.get("event_type", "-")),
-                str(item.get("page_id", "-")),
-                _short(str(item.get("message", "")), 90),
-                key=f"event-{item.get('id', 'x')}",
-            )
+    def set_events(self, events: Sequence[sqlite3.Row]) -> None:
+        self._events = list(events[: self.max_events])
+        self._render_events()
 
+    def prepend_events(self, events: Sequence[sqlite3.Row]) -> None:
+        """Add newer events (newest first) on top of the current rows."""
+        if not events:
+            return
+        self._events = [*events, *self._events][: self.max_events]
+        self._render_events()
+
+    def newest_event_id(self) -> int | None:
+        """Return id of the newest displayed event."""
+        if not self._events:
+            return None
+        return int(self._events[0]["id"])
+
+    def _render_events(self) -> None:
+        self._sync_rows(
+            [
+                (
+                    f"event-{event_id}",
+                    (_fmt_ts(created_at), event_type, str(page_id), _short(message, 90)),
+                )
+                for event_id, page_id, event_type, message, created_at in self._events
+            ]
+        )
 
-class FailedImagesTable(DataTable):
+
+class FailedImagesTable(_SyncedTable):
     """Failed image sample table."""
 
-    def on_mount(self) -> None:
-        self.cursor_type = "row"
-        self.zebra_stripes = True
-        self.add_columns("page", "index", "url", "error")
-
-    def set_failed_images(self, failed_images: Sequence[dict]) -> None:
-        self.clear(columns=False)
-        for item in failed_images:
-            self.add_row(
-                str(item.get("page_num", "-")),
-                str(item.get("image_index", "-")),
-                _short(str(item.get("url", "")), 60),
-                _short(str(item.get("error", "")), 60),
-                key=f"failed-{item.get('id', 'x')}",
-            )
+    COLUMNS = ("page", "index", "url", "error")
+
+    def set_failed_images(self, failed_images: Sequence[sqlite3.Row]) -> None:
+        self._sync_rows(
+            [
+                (
+                    f"failed-{item['id']}",
+                    (
+                        str(item["page_num"]),
+                        str(item["image_index"]),
+                        _short(str(item["url"]), 60),
+                        _short(str(item["error"]), 60),
+                    ),
+                )
+                for item in failed_images
+            ]
+        )
@@ -0,0 +1,232 @@
+"""Shared fakes, config and HTML builders for pipeline-driven tests."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Sequence
+
+from image_harvester.models import DownloadResult, FetchResult, RunConfig, utc_now_iso
+from image_harvester.state import StateStore
+
+
+class FakeFetcher:
+    def __init__(self, html_by_url: Mapping[str, str]) -> None:
+        self.html_by_url = html_by_url
+        self._results = {url: _fake_fetch_result(url, html) for url, html in html_by_url.items()}
+
+    def fetch(self, url: str, timeout_sec: float) -> FetchResult:
+        result = self._results.get(url)
+        if result is None:
+            return _fake_fetch_result(url, None)
+        return result
+
+
+@lru_cache(maxsize=128)
+def _fake_fetch_result(url: str, html: str | None) -> FetchResult:
+    """Fetch results are read-only to the pipeline; share one per (url, html)."""
+    if html is None:
+        return FetchResult(
+            url=url,
+            ok=False,
+            html=None,
+            status_code=404,
+            error="not found",
+            elapsed_ms=1,
+        )
+    return FetchResult(
+        url=url,
+        ok=True,
+        html=html,
+        status_code=200,
+        error=None,
+        elapsed_ms=1,
+    )
+
+
+@lru_cache(maxsize=256)
+def _fake_payload(url: str) -> tuple[bytes, str]:
+    """Fake image bytes for a URL plus their SHA-256; URLs repeat across tests."""
+    payload = url.encode("utf-8")
+    return payload, hashlib.sha256(payload).hexdigest()
+
+
+class AlwaysSuccessDownloader:
+    def download(
+        self,
+        url: str,
+        destination: Path,
+        timeout_sec: float,
+        retries: int,
+        delay_sec: float,
+    ) -> DownloadResult:
+        payload, digest = _fake_payload(url)
+        target = os.fspath(destination)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        return DownloadResult(
+            ok=True,
+            retries_used=0,
+            http_status=200,
+            content_type="image/jpeg",
+            size_bytes=len(payload),
+            sha256=digest,
+            downloaded_at=utc_now_iso(),
+            error=None,
+        )
+
+
+class CrashDownloader:
+    def download(
+        self,
+        url: str,
+        destination: Path,
+        timeout_sec: float,
+        retries: int,
+        delay_sec: float,
+    ) -> DownloadResult:
+        raise RuntimeError("simulated downloader crash")
+
+
+# Stateless, so every test shares it; stateful downloaders stay per-test.
+DOWNLOADER = AlwaysSuccessDownloader()
+
+
+def make_config(tmp_path: Path, **overrides: object) -> RunConfig:
+    payload: dict[str, object] = {
+        "url_template": "https://example.test/gallery/{num}.html",
+        "start_num": 1,
+        "end_num": 1,
+        "output_dir": tmp_path / "downloads",
+        "state_db": tmp_path / "state.sqlite3",
+        "request_delay_sec": 0.0,
+        "page_retries": 0,
+        "image_retries": 0,
+    }
+    payload.update(overrides)
+    return RunConfig(**payload)
+
+
+def seed_job(
+    store: StateStore,
+    job_id: str,
+    *,
+    config_json: str = "{}",
+    status: str = "completed",
+    pages: Sequence[tuple[int, Sequence[str]]] = (),
+    events: Sequence[str] = (),
+) -> None:
+    """Write a job with fully downloaded pages and events in one transaction.
+
+    Mirrors the rows a successful pipeline run leaves, without running it.
+    """
+    with store.transaction():
+        store.upsert_job(job_id, config_json, status)
+        for page_num, image_urls in pages:
+            page = store.ensure_page(
+                job_id,
+                page_num,
+                f"https://example.test/gallery/{page_num}.html",
+                str(page_num),
+            )
+            store.upsert_page_images(
+                page.id,
+                [
+                    (index, url, f"downloads/{page_num:06d}/{index:03d}.jpg")
+                    for index, url in enumerate(image_urls, start=1)
+                ],
+            )
+            for image in store.get_page_images(page.id):
+                payload, digest = _fake_payload(image.url)
+                store.update_image_result(
+                    image.id,
+                    status="completed",
+                    retries=0,
+                    http_status=200,
+                    content_type="image/jpeg",
+                    size_bytes=len(payload),
+                    sha256=digest,
+                    downloaded_at=utc_now_iso(),
+                    error=None,
+                )
+            store.update_page(
+                page.id,
+                status="completed",
+                last_completed_image_index=len(image_urls),
+                image_count=len(image_urls),
+                finish=True,
+            )
+        for event_type in events:
+            store.add_event(job_id, event_type, event_type)
+
+
+_TISHI_HTML = "<div id='tishi'><p>全本<span>%d</span>张图片，欣赏完整作品</p></div>"
+_GALLERY_META_HTML = (
+    "<div class='gallery_jieshao'>"
+    "<h1>[YouMi]尤蜜荟 2024.07.10 Vol.1082 心妍小公主</h1>"
+    "<p>2024-11-02</p>"
+    "<p>"
+    "<a href='/tags/i-cup.html'>I-CUP</a>"
+    "<a href='/tags/meijiao.html'>美脚</a>"
+    "<a href='/tags/jiudian.html'>酒店</a>"
+    "</p>"
+    "</div>"
+    "<div class='gallery_nav'>"
+    "<div class='gallery_renwu'>"
+    "<a href='/jigou/98.html'><div class='gallery_chuangzuo'>机构</div></a>"
+    "<div class='gallery_renwu_title'><a href='/jigou/98.html'>尤蜜荟</a></div>"
+    "</div>"
+    "<div class='gallery_renwu'>"
+    "<a href='/mote/99.html'><div class='gallery_chujing'>模特</div></a>"
+    "<div class='gallery_renwu_title'><a href='/mote/99.html'>李妍曦</a></div>"
+    "</div>"
+    "</div>"
+)
+
+
+_IMG_TAG = '<img src="%s" />'
+_GALLERY_HTML = "<div class='gallerypic'>%s</div>"
+# Whole-page templates, assembled once at import; each render is one `%` call.
+_PLAIN_PAGE_HTML = "<html><body>" + _GALLERY_HTML + "</body></html>"
+_SEQUENCE_PAGE_HTML = "<html><body>" + _TISHI_HTML + _GALLERY_HTML + "</body></html>"
+_META_PAGE_HTML = (
+    "<html><body>" + _GALLERY_META_HTML + _TISHI_HTML + _GALLERY_HTML + "</body></html>"
+)
+
+
+def _img_tags(images: tuple[str, ...]) -> str:
+    return "\n".join(map(_IMG_TAG.__mod__, images))
+
+
+# Pages are rebuilt from the same image lists across tests; cache the rendered HTML.
+@lru_cache(maxsize=64)
+def html_for(*images: str) -> str:
+    return html_for_sequence(len(images), *images)
+
+
+@lru_cache(maxsize=64)
+def html_without_upper(*images: str) -> str:
+    return _PLAIN_PAGE_HTML % _img_tags(images)
+
+
+@lru_cache(maxsize=64)
+def html_for_sequence(total: int, *images: str) -> str:
+    return _SEQUENCE_PAGE_HTML % (total, _img_tags(images))
+
+
+@lru_cache(maxsize=64)
+def html_for_with_meta(*images: str) -> str:
+    return _META_PAGE_HTML % (len(images), _img_tags(images))
+
+
+# Single gallery page with one image; most worker/snapshot tests need nothing more.
+ONE_IMAGE_SITE: Mapping[str, str] = MappingProxyType(
+    {"https://example.test/gallery/1.html": html_for("https://img.test/001.jpg")}
+)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import getpass
+import os
 import shutil
 import sys
 import uuid
@@ -15,6 +17,8 @@ SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
+from image_harvester.state import StateStore  # noqa: E402
+
 
 def pytest_configure(config: pytest.Config) -> None:
     """Pre-create cache_dir to avoid flaky tempdir creation on Windows."""
@@ -27,14 +31,59 @@ def pytest_configure(config: pytest.Config) -> None:
     cache_dir.mkdir(parents=True, exist_ok=True)
 
 
-@pytest.fixture
-def workspace_temp_dir() -> Iterator[Path]:
-    """Create temp dir under workspace to avoid OS temp permission issues."""
-    base = ROOT / "manual-temp-tests"
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Run `fast`-marked tests first so `pytest -x` fails early on cheap checks."""
+    items.sort(key=lambda item: item.get_closest_marker("fast") is None)
+
+
+# RAM-backed tmpfs keeps payload/metadata writes off disk where available (Linux).
+_SHM = Path("/dev/shm")
+
+
+def _shm_base() -> Path | None:
+    """Per-user tmpfs base dir, or None when it cannot be used."""
+    if not (_SHM.is_dir() and os.access(_SHM, os.W_OK)):
+        return None
+    try:
+        base = _SHM / f"image-harvester-tests-{getpass.getuser()}"
+    except (OSError, KeyError):
+        return None
+    return base
+
+
+def _make_case_dir(base: Path) -> Path:
     base.mkdir(parents=True, exist_ok=True)
     case_dir = base / f"case-{uuid.uuid4().hex[:8]}"
     case_dir.mkdir(parents=True, exist_ok=False)
+    return case_dir
+
+
+@pytest.fixture
+def workspace_temp_dir() -> Iterator[Path]:
+    """Create temp dir on tmpfs, else under workspace to avoid OS temp permission issues."""
+    shm_base = _shm_base()
+    case_dir: Path | None = None
+    if shm_base is not None:
+        try:
+            case_dir = _make_case_dir(shm_base)
+        except OSError:
+            shm_base = None
+    if case_dir is None:
+        case_dir = _make_case_dir(ROOT / "manual-temp-tests")
     try:
         yield case_dir
     finally:
         shutil.rmtree(case_dir, ignore_errors=True)
+        if shm_base is not None:
+            # Drop the tmpfs base once empty; another worker's live case keeps it.
+            try:
+                shm_base.rmdir()
+            except OSError:
+                pass
+
+
+@pytest.fixture
+def memory_store() -> Iterator[StateStore]:
+    """In-memory state store for tests that never reopen the database."""
+    with StateStore(Path(":memory:"), durable=False) as store:
+        yield store
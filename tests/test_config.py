@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from dataclasses import FrozenInstanceError
+
 import pytest
 
-from image_harvester.config import build_run_config
+from image_harvester.config import build_run_config, compute_job_id, parse_json, run_config_json
+
+pytestmark = pytest.mark.fast
 
 
 def test_build_run_config_validates_template_placeholder() -> None:
@@ -47,3 +51,20 @@ def test_build_run_config_validates_parallel_limits() -> None:
                 "page_workers": 0,
             }
         )
+
+
+def test_run_config_json_round_trips_through_parse_json() -> None:
+    config = build_run_config(
+        {"url_template": "https://x/图集/{num}", "start_num": 2, "end_num": 9}
+    )
+    assert build_run_config(parse_json(run_config_json(config))) == config
+
+
+def test_run_config_is_immutable_and_hashable() -> None:
+    config = build_run_config({"url_template": "https://x/{num}", "start_num": 1})
+    with pytest.raises(FrozenInstanceError):
+        config.engine = "playwright"  # type: ignore[misc]
+    same = build_run_config({"url_template": "https://x/{num}", "start_num": 1})
+    assert hash(config) == hash(same)
+    assert compute_job_id(config) == compute_job_id(same)
+    assert run_config_json(config) is run_config_json(same)
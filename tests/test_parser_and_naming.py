@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import pytest
+
 from image_harvester.naming import image_file_name, page_dir_name, source_id_from_page_url
 from image_harvester.parser import parse_gallery_upper_bound, parse_image_urls
 
+pytestmark = pytest.mark.fast
+
 
 def test_parse_image_urls_keeps_dom_order() -> None:
     html = """
@@ -1,66 +1,27 @@
 from __future__ import annotations
 
-import hashlib
-import json
+import shutil
+from operator import attrgetter
 from pathlib import Path
 
 import pytest
 
-from image_harvester.config import compute_job_id, run_config_json
-from image_harvester.models import DownloadResult, FetchResult, RunConfig, utc_now_iso
+from _harness import (
+    DOWNLOADER,
+    AlwaysSuccessDownloader,
+    FakeFetcher,
+    html_for,
+    html_for_sequence,
+    html_for_with_meta,
+    html_without_upper,
+    make_config,
+)
+from image_harvester.config import compute_job_id, parse_json, run_config_json
+from image_harvester.models import DownloadResult
 from image_harvester.pipeline import ImageHarvesterPipeline
 from image_harvester.state import StateStore
 
 
-class FakeFetcher:
-    def __init__(self, html_by_url: dict[str, str]) -> None:
-        self.html_by_url = html_by_url
-
-    def fetch(self, url: str, timeout_sec: float) -> FetchResult:
-        html = self.html_by_url.get(url)
-        if html is None:
-            return FetchResult(
-                url=url,
-                ok=False,
-                html=None,
-                status_code=404,
-                error="not found",
-                elapsed_ms=1,
-            )
-        return FetchResult(
-            url=url,
-            ok=True,
-            html=html,
-            status_code=200,
-            error=None,
-            elapsed_ms=1,
-        )
-
-
-class AlwaysSuccessDownloader:
-    def download(
-        self,
-        url: str,
-        destination: Path,
-        timeout_sec: float,
-        retries: int,
-        delay_sec: float,
-    ) -> DownloadResult:
-        payload = url.encode("utf-8")
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        destination.write_bytes(payload)
-        return DownloadResult(
-            ok=True,
-            retries_used=0,
-            http_status=200,
-            content_type="image/jpeg",
-            size_bytes=len(payload),
-            sha256=hashlib.sha256(payload).hexdigest(),
-            downloaded_at=utc_now_iso(),
-            error=None,
-        )
-
-
 class CrashOnSecondDownloader(AlwaysSuccessDownloader):
     def __init__(self) -> None:
         self.count = 0
@@ -105,372 +66,272 @@ class FailOneDownloader(AlwaysSuccessDownloader):
         return super().download(url, destination, timeout_sec, retries, delay_sec)
 
 
-def _config(tmp_path: Path, **overrides: object) -> RunConfig:
-    payload = {
-        "url_template": "https://example.test/gallery/{num}.html",
-        "start_num": 1,
-        "end_num": 1,
-        "output_dir": tmp_path / "downloads",
-        "state_db": tmp_path / "state.sqlite3",
-        "request_delay_sec": 0.0,
-        "page_retries": 0,
-        "image_retries": 0,
+@pytest.fixture(scope="module")
+def sequence_x_pages() -> dict[str, str]:
+    """Seed page (3 of 6 images listed) shared by the upper-bound sequence tests."""
+    return {
+        "https://example.test/gallery/1.html": html_for_sequence(
+            6,
+            "https://img.test/x/001.jpg",
+            "https://img.test/x/002.jpg",
+            "https://img.test/x/003.jpg",
+        ),
     }
-    payload.update(overrides)
-    return RunConfig(**payload)
 
 
-def _html_for(*images: str) -> str:
-    tags = "\n".join([f'<img src="{url}" />' for url in images])
-    return (
-        "<html><body>"
-        f"<div id='tishi'><p>全本<span>{len(images)}</span>张图片，欣赏完整作品</p></div>"
-        f"<div class='gallerypic'>{tags}</div>"
-        "</body></html>"
-    )
-
-
-def _html_without_upper(*images: str) -> str:
-    tags = "\n".join([f'<img src="{url}" />' for url in images])
-    return f"<html><body><div class='gallerypic'>{tags}</div></body></html>"
-
-
-def _html_for_sequence(total: int, *images: str) -> str:
-    tags = "\n".join([f'<img src="{url}" />' for url in images])
-    return (
-        "<html><body>"
-        f"<div id='tishi'><p>全本<span>{total}</span>张图片，欣赏完整作品</p></div>"
-        f"<div class='gallerypic'>{tags}</div>"
-        "</body></html>"
-    )
-
-
-def _html_for_with_meta(*images: str) -> str:
-    tags = "\n".join([f'<img src="{url}" />' for url in images])
-    return (
-        "<html><body>"
-        "<div class='gallery_jieshao'>"
-        "<h1>[YouMi]尤蜜荟 2024.07.10 Vol.1082 心妍小公主</h1>"
-        "<p>2024-11-02</p>"
-        "<p>"
-        "<a href='/tags/i-cup.html'>I-CUP</a>"
-        "<a href='/tags/meijiao.html'>美脚</a>"
-        "<a href='/tags/jiudian.html'>酒店</a>"
-        "</p>"
-        "</div>"
-        "<div class='gallery_nav'>"
-        "<div class='gallery_renwu'>"
-        "<a href='/jigou/98.html'><div class='gallery_chuangzuo'>机构</div></a>"
-        "<div class='gallery_renwu_title'><a href='/jigou/98.html'>尤蜜荟</a></div>"
-        "</div>"
-        "<div class='gallery_renwu'>"
-        "<a href='/mote/99.html'><div class='gallery_chujing'>模特</div></a>"
-        "<div class='gallery_renwu_title'><a href='/mote/99.html'>李妍曦</a></div>"
-        "</div>"
-        "</div>"
-        f"<div id='tishi'><p>全本<span>{len(images)}</span>张图片，欣赏完整作品</p></div>"
-        f"<div class='gallerypic'>{tags}</div>"
-        "</body></html>"
-    )
-
-
-def test_run_creates_metadata_and_respects_end_num(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir, end_num=2)
+def test_run_creates_metadata_and_respects_end_num(
+    workspace_temp_dir: Path, memory_store: StateStore
+) -> None:
+    cfg = make_config(workspace_temp_dir, end_num=2)
     html_by_url = {
-        "https://example.test/gallery/1.html": _html_for_with_meta(
+        "https://example.test/gallery/1.html": html_for_with_meta(
             "https://img.test/1/001.jpg", "https://img.test/1/002.jpg"
         ),
-        "https://example.test/gallery/2.html": _html_for(
+        "https://example.test/gallery/2.html": html_for(
             "https://img.test/2/001.jpg", "https://img.test/2/002.jpg"
         ),
     }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        job_id = compute_job_id(cfg)
-        summary = pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        assert summary["images"]["completed_images"] == 4
-
-        page1_metadata = cfg.output_dir / "000001" / "metadata.json"
-        page2_metadata = cfg.output_dir / "000002" / "metadata.json"
-        assert page1_metadata.exists()
-        assert page2_metadata.exists()
-
-        metadata = json.loads(page1_metadata.read_text(encoding="utf-8"))
-        assert {
-            "job_id",
-            "page_num",
-            "page_url",
-            "source_id",
-            "selector",
-            "engine",
-            "summary",
-        }.issubset(metadata.keys())
-        assert {"title", "published_date", "tags", "organizations", "models"}.issubset(
-            metadata.keys()
-        )
-        assert "images" not in metadata
-        assert metadata["title"] == "[YouMi]尤蜜荟 2024.07.10 Vol.1082 心妍小公主"
-        assert metadata["published_date"] == "2024-11-02"
-        assert metadata["tags"] == ["I-CUP", "美脚", "酒店"]
-        assert metadata["organizations"] == ["尤蜜荟"]
-        assert metadata["models"] == ["李妍曦"]
-        assert metadata["summary"]["total_count"] == 2
-        assert metadata["summary"]["success_count"] == 2
-        assert metadata["summary"]["failed_count"] == 0
-    finally:
-        store.close()
-
-
-def test_resume_after_crash_without_manual_start(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
+    pipeline = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=DOWNLOADER,
+    )
+    job_id = compute_job_id(cfg)
+    summary = pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
+    assert summary["images"]["completed_images"] == 4
+
+    page1_metadata = cfg.output_dir / "000001" / "metadata.json"
+    page2_metadata = cfg.output_dir / "000002" / "metadata.json"
+    assert page1_metadata.exists()
+    assert page2_metadata.exists()
+
+    metadata = parse_json(page1_metadata.read_bytes())
+    assert {
+        "job_id",
+        "page_num",
+        "page_url",
+        "source_id",
+        "selector",
+        "engine",
+        "summary",
+    }.issubset(metadata.keys())
+    assert {"title", "published_date", "tags", "organizations", "models"}.issubset(
+        metadata.keys()
+    )
+    assert "images" not in metadata
+    assert metadata["title"] == "[YouMi]尤蜜荟 2024.07.10 Vol.1082 心妍小公主"
+    assert metadata["published_date"] == "2024-11-02"
+    assert metadata["tags"] == ["I-CUP", "美脚", "酒店"]
+    assert metadata["organizations"] == ["尤蜜荟"]
+    assert metadata["models"] == ["李妍曦"]
+    assert metadata["summary"]["total_count"] == 2
+    assert metadata["summary"]["success_count"] == 2
+    assert metadata["summary"]["failed_count"] == 0
+
+
+def test_resume_after_crash_without_manual_start(
+    workspace_temp_dir: Path, memory_store: StateStore
+) -> None:
+    cfg = make_config(workspace_temp_dir)
     html_by_url = {
-        "https://example.test/gallery/1.html": _html_for(
+        "https://example.test/gallery/1.html": html_for(
             "https://img.test/r/1.jpg", "https://img.test/r/2.jpg"
         )
     }
-    store = StateStore(cfg.state_db)
     job_id = compute_job_id(cfg)
-    try:
-        pipeline1 = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=CrashOnSecondDownloader(),
-        )
-        with pytest.raises(RuntimeError):
-            pipeline1.run(job_id=job_id, config_json=run_config_json(cfg))
-
-        pipeline2 = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        summary = pipeline2.run(job_id=job_id, config_json=run_config_json(cfg))
-        assert summary["images"]["completed_images"] == 2
-        assert summary["images"]["failed_images"] == 0
-    finally:
-        store.close()
+    config_json = run_config_json(cfg)
+    pipeline1 = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=CrashOnSecondDownloader(),
+    )
+    with pytest.raises(RuntimeError):
+        pipeline1.run(job_id=job_id, config_json=config_json)
+
+    pipeline2 = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=DOWNLOADER,
+    )
+    summary = pipeline2.run(job_id=job_id, config_json=config_json)
+    assert summary["images"]["completed_images"] == 2
+    assert summary["images"]["failed_images"] == 0
 
 
-def test_no_end_num_stops_after_consecutive_failures(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir, end_num=None, stop_after_consecutive_page_failures=2)
+def test_no_end_num_stops_after_consecutive_failures(
+    workspace_temp_dir: Path, memory_store: StateStore
+) -> None:
+    cfg = make_config(workspace_temp_dir, end_num=None, stop_after_consecutive_page_failures=2)
     html_by_url = {
-        "https://example.test/gallery/1.html": _html_for("https://img.test/x/1.jpg"),
+        "https://example.test/gallery/1.html": html_for("https://img.test/x/1.jpg"),
     }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        job_id = compute_job_id(cfg)
-        pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        pages = store.list_pages(job_id)
-        assert [p.status for p in pages] == ["completed", "failed_fetch", "failed_fetch"]
-    finally:
-        store.close()
+    pipeline = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=DOWNLOADER,
+    )
+    job_id = compute_job_id(cfg)
+    pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
+    pages = memory_store.list_pages(job_id)
+    assert list(map(attrgetter("status"), pages)) == ["completed", "failed_fetch", "failed_fetch"]
 
 
-def test_retry_failed_only_retries_failed_records(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
+def test_retry_failed_only_retries_failed_records(
+    workspace_temp_dir: Path, memory_store: StateStore
+) -> None:
+    cfg = make_config(workspace_temp_dir)
     html_by_url = {
-        "https://example.test/gallery/1.html": _html_for_with_meta(
+        "https://example.test/gallery/1.html": html_for_with_meta(
             "https://img.test/r/001.jpg", "https://img.test/r/002.jpg"
         )
     }
-    store = StateStore(cfg.state_db)
     job_id = compute_job_id(cfg)
-    try:
-        pipeline_run = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=FailOneDownloader("/002.jpg"),
-        )
-        pipeline_run.run(job_id=job_id, config_json=run_config_json(cfg))
-        assert len(store.get_failed_images(job_id)) == 1
-
-        pipeline_retry = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        retry_summary = pipeline_retry.retry_failed(job_id)
-        assert retry_summary["retried"] == 1
-        assert retry_summary["recovered"] == 1
-        assert len(store.get_failed_images(job_id)) == 0
-        metadata = json.loads((cfg.output_dir / "000001" / "metadata.json").read_text("utf-8"))
-        assert metadata["title"] == "[YouMi]尤蜜荟 2024.07.10 Vol.1082 心妍小公主"
-        assert metadata["published_date"] == "2024-11-02"
-        assert metadata["tags"] == ["I-CUP", "美脚", "酒店"]
-        assert metadata["organizations"] == ["尤蜜荟"]
-        assert metadata["models"] == ["李妍曦"]
-    finally:
-        store.close()
-
-
-def test_sequence_expand_marks_completed_at_upper_bound_by_default(
-    workspace_temp_dir: Path,
-) -> None:
-    cfg = _config(workspace_temp_dir)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_for_sequence(
+    pipeline_run = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=FailOneDownloader("/002.jpg"),
+    )
+    pipeline_run.run(job_id=job_id, config_json=run_config_json(cfg))
+    assert len(memory_store.get_failed_images(job_id)) == 1
+
+    pipeline_retry = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=DOWNLOADER,
+    )
+    retry_summary = pipeline_retry.retry_failed(job_id)
+    assert retry_summary["retried"] == 1
+    assert retry_summary["recovered"] == 1
+    assert len(memory_store.get_failed_images(job_id)) == 0
+    metadata = parse_json((cfg.output_dir / "000001" / "metadata.json").read_bytes())
+    assert metadata["title"] == "[YouMi]尤蜜荟 2024.07.10 Vol.1082 心妍小公主"
+    assert metadata["published_date"] == "2024-11-02"
+    assert metadata["tags"] == ["I-CUP", "美脚", "酒店"]
+    assert metadata["organizations"] == ["尤蜜荟"]
+    assert metadata["models"] == ["李妍曦"]
+
+
+@pytest.mark.parametrize(
+    ("overrides", "fail_needle", "expected_status", "expected_completed", "expected_event"),
+    [
+        pytest.param({}, "/007.jpg", "completed", 6, None, id="stops-at-upper-bound"),
+        pytest.param(
+            {"sequence_probe_after_upper_bound": True},
+            "/007.jpg",
+            "completed",
             6,
-            "https://img.test/x/001.jpg",
-            "https://img.test/x/002.jpg",
-            "https://img.test/x/003.jpg",
+            "sequence_probe_end",
+            id="probes-after-upper-bound",
         ),
-    }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=FailOneDownloader("/007.jpg"),
-        )
-        job_id = compute_job_id(cfg)
-        summary = pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        assert summary["images"]["completed_images"] == 6
-        page = store.get_page(job_id, 1)
-        assert page is not None
-        assert page.status == "completed"
-        events = store.list_events(job_id, limit=50)
+        pytest.param(
+            {},
+            "/005.jpg",
+            "failed_fetch",
+            None,
+            "sequence_incomplete_failed",
+            id="fails-below-upper-bound",
+        ),
+    ],
+)
+def test_sequence_expand_against_upper_bound(
+    workspace_temp_dir: Path,
+    memory_store: StateStore,
+    sequence_x_pages: dict[str, str],
+    overrides: dict[str, object],
+    fail_needle: str,
+    expected_status: str,
+    expected_completed: int | None,
+    expected_event: str | None,
+) -> None:
+    cfg = make_config(workspace_temp_dir, **overrides)
+    pipeline = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(sequence_x_pages),
+        downloader=FailOneDownloader(fail_needle),
+    )
+    job_id = compute_job_id(cfg)
+    summary = pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
+    if expected_completed is not None:
+        assert summary["images"]["completed_images"] == expected_completed
+    page = memory_store.get_page(job_id, 1)
+    assert page is not None
+    assert page.status == expected_status
+    if expected_event is None:
+        events = memory_store.list_events(job_id, limit=50)
         assert not any(e["event_type"].startswith("sequence_probe_") for e in events)
-    finally:
-        store.close()
+    else:
+        assert memory_store.has_event(job_id, expected_event)
 
 
-def test_sequence_expand_can_probe_after_upper_bound_when_enabled(
-    workspace_temp_dir: Path,
+def test_sequence_expand_requires_upper_bound_when_enabled(
+    workspace_temp_dir: Path, memory_store: StateStore
 ) -> None:
-    cfg = _config(workspace_temp_dir, sequence_probe_after_upper_bound=True)
+    cfg = make_config(workspace_temp_dir)
     html_by_url = {
-        "https://example.test/gallery/1.html": _html_for_sequence(
-            6,
-            "https://img.test/x/001.jpg",
-            "https://img.test/x/002.jpg",
-            "https://img.test/x/003.jpg",
-        ),
+        "https://example.test/gallery/1.html": html_without_upper("https://img.test/z/001.jpg"),
     }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=FailOneDownloader("/007.jpg"),
-        )
-        job_id = compute_job_id(cfg)
-        summary = pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        assert summary["images"]["completed_images"] == 6
-        page = store.get_page(job_id, 1)
-        assert page is not None
-        assert page.status == "completed"
-        events = store.list_events(job_id, limit=50)
-        assert any(e["event_type"] == "sequence_probe_end" for e in events)
-    finally:
-        store.close()
-
-
-def test_sequence_expand_marks_page_failed_when_not_reaching_upper_bound(
-    workspace_temp_dir: Path,
+    pipeline = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=DOWNLOADER,
+    )
+    job_id = compute_job_id(cfg)
+    pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
+    page = memory_store.get_page(job_id, 1)
+    assert page is not None
+    assert page.status == "failed_fetch"
+    assert page.image_count == 0
+    assert memory_store.has_event(job_id, "sequence_upper_bound_missing")
+    metadata = parse_json((cfg.output_dir / "000001" / "metadata.json").read_bytes())
+    assert "images" not in metadata
+    assert metadata["title"] == ""
+    assert metadata["published_date"] == ""
+    assert metadata["tags"] == []
+    assert metadata["organizations"] == []
+    assert metadata["models"] == []
+
+
+def test_sequence_expand_fails_when_seed_missing(
+    workspace_temp_dir: Path, memory_store: StateStore
 ) -> None:
-    cfg = _config(workspace_temp_dir)
+    cfg = make_config(workspace_temp_dir)
     html_by_url = {
-        "https://example.test/gallery/1.html": _html_for_sequence(
-            6,
-            "https://img.test/y/001.jpg",
-            "https://img.test/y/002.jpg",
-            "https://img.test/y/003.jpg",
-        ),
-    }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=FailOneDownloader("/005.jpg"),
-        )
-        job_id = compute_job_id(cfg)
-        pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        page = store.get_page(job_id, 1)
-        assert page is not None
-        assert page.status == "failed_fetch"
-        events = store.list_events(job_id, limit=50)
-        assert any(e["event_type"] == "sequence_incomplete_failed" for e in events)
-    finally:
-        store.close()
-
-
-def test_sequence_expand_requires_upper_bound_when_enabled(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_without_upper("https://img.test/z/001.jpg"),
-    }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        job_id = compute_job_id(cfg)
-        pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        page = store.get_page(job_id, 1)
-        assert page is not None
-        assert page.status == "failed_fetch"
-        assert page.image_count == 0
-        events = store.list_events(job_id, limit=50)
-        assert any(e["event_type"] == "sequence_upper_bound_missing" for e in events)
-        metadata = json.loads((cfg.output_dir / "000001" / "metadata.json").read_text("utf-8"))
-        assert "images" not in metadata
-        assert metadata["title"] == ""
-        assert metadata["published_date"] == ""
-        assert metadata["tags"] == []
-        assert metadata["organizations"] == []
-        assert metadata["models"] == []
-    finally:
-        store.close()
-
-
-def test_sequence_expand_fails_when_seed_missing(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_for_sequence(
+        "https://example.test/gallery/1.html": html_for_sequence(
             6,
             "https://img.test/z/cover.jpg",
             "https://img.test/z/poster.jpg",
             "https://img.test/z/thumb.jpg",
         ),
     }
-    store = StateStore(cfg.state_db)
-    try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        job_id = compute_job_id(cfg)
-        pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
-        page = store.get_page(job_id, 1)
-        assert page is not None
-        assert page.status == "failed_fetch"
-        assert page.image_count == 0
-        events = store.list_events(job_id, limit=50)
-        assert any(e["event_type"] == "sequence_seed_missing" for e in events)
-    finally:
-        store.close()
+    pipeline = ImageHarvesterPipeline(
+        config=cfg,
+        store=memory_store,
+        fetcher=FakeFetcher(html_by_url),
+        downloader=DOWNLOADER,
+    )
+    job_id = compute_job_id(cfg)
+    pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
+    page = memory_store.get_page(job_id, 1)
+    assert page is not None
+    assert page.status == "failed_fetch"
+    assert page.image_count == 0
+    assert memory_store.has_event(job_id, "sequence_seed_missing")
+
+
+def test_shared_downloader_recreates_removed_output_dir(workspace_temp_dir: Path) -> None:
+    url = "https://img.test/shared/001.jpg"
+    destination = workspace_temp_dir / "downloads" / "000001" / "001.jpg"
+    assert DOWNLOADER.download(url, destination, 1.0, 0, 0.0).ok
+
+    shutil.rmtree(workspace_temp_dir / "downloads")
+    result = DOWNLOADER.download(url, destination, 1.0, 0, 0.0)
+    assert result.ok
+    assert destination.read_bytes() == url.encode("utf-8")
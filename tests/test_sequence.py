@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import pytest
+
 from image_harvester.sequence import build_sequence_url, extract_sequence_seed
 
+pytestmark = pytest.mark.fast
+
 
 def test_extract_sequence_seed_from_numbered_url() -> None:
     parsed = extract_sequence_seed("https://oss.example.com/img/77163/001.jpg")
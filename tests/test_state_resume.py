@@ -1,31 +1,87 @@
 from __future__ import annotations
 
+import sqlite3
 from pathlib import Path
 
+import pytest
+
 from image_harvester.state import StateStore
 
 
-def test_reset_running_to_pending_restores_interrupted_rows(workspace_temp_dir: Path) -> None:
+def test_reset_running_to_pending_restores_interrupted_rows(
+    workspace_temp_dir: Path, memory_store: StateStore
+) -> None:
+    store = memory_store
+    job_id = "job_x"
+    store.upsert_job(job_id, "{}", "running")
+    page = store.ensure_page(job_id, 1, "https://example/1.html", "1")
+    store.update_page(page.id, status="running")
+    store.upsert_page_images(
+        page.id,
+        [(1, "https://i/1.jpg", str(workspace_temp_dir / "a.jpg"))],
+    )
+    image = store.get_page_images(page.id)[0]
+    store.update_image_running(image.id)
+
+    store.reset_running_to_pending(job_id)
+
+    page_after = store.get_page(job_id, 1)
+    assert page_after is not None
+    assert page_after.status == "pending"
+    image_after = store.get_page_images(page.id)[0]
+    assert image_after.status == "pending"
+
+
+def test_state_store_context_manager_flushes_and_closes(workspace_temp_dir: Path) -> None:
     db = workspace_temp_dir / "state.sqlite3"
-    store = StateStore(db)
-    try:
-        job_id = "job_x"
-        store.upsert_job(job_id, "{}", "running")
-        page = store.ensure_page(job_id, 1, "https://example/1.html", "1")
-        store.update_page(page.id, status="running")
-        store.upsert_page_images(
-            page.id,
-            [(1, "https://i/1.jpg", str(workspace_temp_dir / "a.jpg"))],
-        )
-        image = store.get_page_images(page.id)[0]
-        store.update_image_running(image.id)
-
-        store.reset_running_to_pending(job_id)
-
-        page_after = store.get_page(job_id, 1)
-        assert page_after is not None
-        assert page_after.status == "pending"
-        image_after = store.get_page_images(page.id)[0]
-        assert image_after.status == "pending"
-    finally:
-        store.close()
+    with StateStore(db, batch_size=100) as store:
+        store.upsert_job("job_ctx", "{}", "running")
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.conn.execute("SELECT 1")
+
+    with StateStore(db) as reopened:
+        job = reopened.get_job("job_ctx")
+        assert job is not None
+        assert job.status == "running"
+
+
+def test_has_event_matches_job_and_type(memory_store: StateStore) -> None:
+    memory_store.upsert_job("job_a", "{}", "running")
+    memory_store.upsert_job("job_b", "{}", "running")
+    memory_store.add_event("job_a", "page_done", "ok")
+
+    assert memory_store.has_event("job_a", "page_done")
+    assert not memory_store.has_event("job_a", "page_failed")
+    assert not memory_store.has_event("job_b", "page_done")
+
+
+def test_transaction_commits_once_and_rolls_back_on_error(workspace_temp_dir: Path) -> None:
+    db = workspace_temp_dir / "state.sqlite3"
+    with StateStore(db) as store:
+        store.upsert_job("job_tx", "{}", "running")
+        with store.transaction():
+            store.add_event("job_tx", "first", "kept")
+            with store.transaction():
+                store.add_event("job_tx", "second", "kept")
+
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.add_event("job_tx", "third", "dropped")
+                raise RuntimeError("boom")
+
+        with StateStore(db) as reader:
+            events = reader.list_events("job_tx")
+            assert [item["event_type"] for item in events] == ["second", "first"]
+
+
+def test_read_transaction_joins_open_write_transaction(memory_store: StateStore) -> None:
+    memory_store.upsert_job("job_rt", "{}", "running")
+    with memory_store.transaction():
+        memory_store.add_event("job_rt", "pending", "not committed yet")
+        with memory_store.read_transaction():
+            assert memory_store.has_event("job_rt", "pending")
+        memory_store.add_event("job_rt", "after_read", "still in transaction")
+
+    assert memory_store.has_event("job_rt", "after_read")
+    with memory_store.read_transaction():
+        assert memory_store.get_job("job_rt") is not None
@@ -9,6 +9,8 @@ from image_harvester.tui.forms import (
     payload_from_run_config,
 )
 
+pytestmark = pytest.mark.fast
+
 
 def _payload(**overrides: object) -> dict[str, object]:
     payload = form_defaults()
@@ -75,3 +77,12 @@ def test_payload_from_run_config_uses_form_shape() -> None:
 def test_form_can_enable_sequence_probe_after_upper_bound() -> None:
     config = build_run_config_from_form(_payload(sequence_probe_after_upper_bound=True))
     assert config.sequence_probe_after_upper_bound is True
+
+
+def test_form_reuses_run_config_for_unchanged_payload() -> None:
+    first = build_run_config_from_form(_payload(end_num="3"))
+    second = build_run_config_from_form(_payload(end_num="3"))
+    changed = build_run_config_from_form(_payload(end_num="4"))
+    assert second is first
+    assert changed is not first
+    assert changed.end_num == 4
@@ -1,174 +1,212 @@
 from __future__ import annotations
 
-import hashlib
 import json
 from pathlib import Path
 
+import pytest
+
+from _harness import DOWNLOADER, ONE_IMAGE_SITE, FakeFetcher, make_config, seed_job
 from image_harvester.config import compute_job_id, run_config_json
-from image_harvester.models import DownloadResult, FetchResult, RunConfig, utc_now_iso
 from image_harvester.pipeline import ImageHarvesterPipeline
 from image_harvester.state import StateStore
 from image_harvester.tui.services import SnapshotService
 
 
-class FakeFetcher:
-    def __init__(self, html_by_url: dict[str, str]) -> None:
-        self.html_by_url = html_by_url
-
-    def fetch(self, url: str, timeout_sec: float) -> FetchResult:
-        html = self.html_by_url.get(url)
-        if html is None:
-            return FetchResult(
-                url=url,
-                ok=False,
-                html=None,
-                status_code=404,
-                error="not found",
-                elapsed_ms=1,
-            )
-        return FetchResult(
-            url=url,
-            ok=True,
-            html=html,
-            status_code=200,
-            error=None,
-            elapsed_ms=1,
+def test_snapshot_service_reads_stats_events_and_pages(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+    job_id = compute_job_id(cfg)
+
+    with StateStore(cfg.state_db, durable=False) as store:
+        seed_job(
+            store,
+            job_id,
+            config_json=run_config_json(cfg),
+            pages=[(1, ["https://img.test/001.jpg"])],
+            events=["job_start", "job_end"],
         )
 
+    service = SnapshotService(cfg.state_db)
+    try:
+        jobs = service.list_jobs(limit=10)
+        assert jobs
+        assert jobs[0].job_id == job_id
 
-class AlwaysSuccessDownloader:
-    def download(
-        self,
-        url: str,
-        destination: Path,
-        timeout_sec: float,
-        retries: int,
-        delay_sec: float,
-    ) -> DownloadResult:
-        payload = url.encode("utf-8")
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        destination.write_bytes(payload)
-        return DownloadResult(
-            ok=True,
-            retries_used=0,
-            http_status=200,
-            content_type="image/jpeg",
-            size_bytes=len(payload),
-            sha256=hashlib.sha256(payload).hexdigest(),
-            downloaded_at=utc_now_iso(),
-            error=None,
-        )
+        snapshot = service.get_snapshot(job_id, events_limit=20, failed_limit=20)
+        assert snapshot is not None
+        assert snapshot.job_id == job_id
+        assert snapshot.stats["images"]["completed_images"] == 1
+        assert len(snapshot.pages) == 1
+        assert any(item["event_type"] == "job_start" for item in snapshot.events)
+    finally:
+        service.close()
 
 
-def _config(tmp_path: Path, **overrides: object) -> RunConfig:
-    payload: dict[str, object] = {
-        "url_template": "https://example.test/gallery/{num}.html",
-        "start_num": 1,
-        "end_num": 1,
-        "output_dir": tmp_path / "downloads",
-        "state_db": tmp_path / "state.sqlite3",
-        "request_delay_sec": 0.0,
-        "page_retries": 0,
-        "image_retries": 0,
-    }
-    payload.update(overrides)
-    return RunConfig(**payload)
+def test_snapshot_service_orders_pages_and_events_desc(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir, end_num=2)
+    job_id = compute_job_id(cfg)
 
+    with StateStore(cfg.state_db, durable=False) as store:
+        seed_job(
+            store,
+            job_id,
+            config_json=run_config_json(cfg),
+            pages=[(1, ["https://img.test/001.jpg"]), (2, ["https://img.test/001.jpg"])],
+        )
 
-def _html_for(*images: str) -> str:
-    tags = "\n".join([f'<img src="{url}" />' for url in images])
-    return (
-        "<html><body>"
-        f"<div id='tishi'><p>全本<span>{len(images)}</span>张图片，欣赏完整作品</p></div>"
-        f"<div class='gallerypic'>{tags}</div>"
-        "</body></html>"
-    )
+        page1 = store.get_page(job_id, 1)
+        assert page1 is not None
+        with store.transaction():
+            store.update_page(page1.id, status=page1.status, error=page1.error)
+            store.add_event(job_id, "custom_old", "old")
+            store.add_event(job_id, "custom_new", "new")
 
+    service = SnapshotService(cfg.state_db)
+    try:
+        snapshot = service.get_snapshot(job_id, events_limit=20, failed_limit=20)
+        assert snapshot is not None
+        assert [page.page_num for page in snapshot.pages] == [1, 2]
+        assert snapshot.events[0]["event_type"] == "custom_new"
+        assert snapshot.events[1]["event_type"] == "custom_old"
 
-def test_snapshot_service_reads_stats_events_and_pages(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_for("https://img.test/001.jpg"),
-    }
+        limited = service.get_snapshot(job_id, pages_limit=1)
+        assert limited is not None
+        assert [page.page_num for page in limited.pages] == [1]
+    finally:
+        service.close()
+
+
+def test_snapshot_service_returns_only_new_events_since_cursor(
+    workspace_temp_dir: Path,
+) -> None:
+    cfg = make_config(workspace_temp_dir)
     job_id = compute_job_id(cfg)
+    with StateStore(cfg.state_db, durable=False) as store:
+        store.upsert_job(job_id, run_config_json(cfg), "running")
+        store.add_event(job_id, "first", "first")
 
-    store = StateStore(cfg.state_db)
+    service = SnapshotService(cfg.state_db)
     try:
-        pipeline = ImageHarvesterPipeline(
-            config=cfg,
-            store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
-        )
-        pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
+        full = service.get_snapshot(job_id)
+        assert full is not None
+        assert full.events_appended is False
+        started_at = full.stats["job"]["started_at"]
+        last_id = full.events[0]["id"]
+
+        with StateStore(cfg.state_db) as store:
+            store.add_event(job_id, "second", "second")
+
+        incremental = service.get_snapshot(job_id, events_since=(started_at, last_id))
+        assert incremental is not None
+        assert incremental.events_appended is True
+        assert [item["event_type"] for item in incremental.events] == ["second"]
+
+        other_run = service.get_snapshot(job_id, events_since=("older-run", last_id))
+        assert other_run is not None
+        assert other_run.events_appended is False
+        assert [item["event_type"] for item in other_run.events] == ["second", "first"]
     finally:
-        store.close()
+        service.close()
+
+
+def test_snapshot_service_reloads_events_when_new_batch_is_full(
+    workspace_temp_dir: Path,
+) -> None:
+    cfg = make_config(workspace_temp_dir)
+    job_id = compute_job_id(cfg)
+    with StateStore(cfg.state_db, durable=False) as store:
+        store.upsert_job(job_id, run_config_json(cfg), "running")
+        store.add_event(job_id, "seen", "seen")
 
     service = SnapshotService(cfg.state_db)
-    jobs = service.list_jobs(limit=10)
-    assert jobs
-    assert jobs[0].job_id == job_id
+    try:
+        full = service.get_snapshot(job_id)
+        assert full is not None
+        started_at = full.stats["job"]["started_at"]
+        last_id = full.events[0]["id"]
 
-    snapshot = service.get_snapshot(job_id, events_limit=20, failed_limit=20)
-    assert snapshot is not None
-    assert snapshot.job_id == job_id
-    assert snapshot.stats["images"]["completed_images"] == 1
-    assert len(snapshot.pages) == 1
-    assert any(item["event_type"] == "job_start" for item in snapshot.events)
+        with StateStore(cfg.state_db) as store:
+            for index in range(3):
+                store.add_event(job_id, f"new-{index}", "new")
 
+        burst = service.get_snapshot(job_id, events_limit=2, events_since=(started_at, last_id))
+        assert burst is not None
+        # Prepending would drop new-0 silently; the newest page replaces the list.
+        assert burst.events_appended is False
+        assert [item["event_type"] for item in burst.events] == ["new-2", "new-1"]
+    finally:
+        service.close()
 
-def test_snapshot_service_orders_pages_and_events_desc(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir, end_num=2)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_for("https://img.test/001.jpg"),
-        "https://example.test/gallery/2.html": _html_for("https://img.test/001.jpg"),
-    }
+
+def test_snapshot_service_reuses_snapshot_until_database_changes(
+    workspace_temp_dir: Path,
+) -> None:
+    cfg = make_config(workspace_temp_dir)
     job_id = compute_job_id(cfg)
+    with StateStore(cfg.state_db, durable=False) as store:
+        store.upsert_job(job_id, run_config_json(cfg), "running")
+        store.add_event(job_id, "first", "first")
 
-    store = StateStore(cfg.state_db)
+    service = SnapshotService(cfg.state_db)
     try:
+        first = service.get_dashboard_state(job_id)
+        assert service.get_dashboard_state(job_id) is first
+
+        with StateStore(cfg.state_db) as store:
+            store.add_event(job_id, "second", "second")
+
+        changed = service.get_dashboard_state(job_id)
+        assert changed is not first
+        assert changed.snapshot is not None
+        assert changed.snapshot.events[0]["event_type"] == "second"
+    finally:
+        service.close()
+
+
+def test_snapshot_service_dashboard_defaults_to_latest_job(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+    job_id = compute_job_id(cfg)
+
+    with StateStore(cfg.state_db, durable=False) as store:
         pipeline = ImageHarvesterPipeline(
             config=cfg,
             store=store,
-            fetcher=FakeFetcher(html_by_url),
-            downloader=AlwaysSuccessDownloader(),
+            fetcher=FakeFetcher(ONE_IMAGE_SITE),
+            downloader=DOWNLOADER,
         )
         pipeline.run(job_id=job_id, config_json=run_config_json(cfg))
 
-        page1 = store.get_page(job_id, 1)
-        assert page1 is not None
-        store.update_page(page1.id, status=page1.status, error=page1.error)
+    service = SnapshotService(cfg.state_db)
+    try:
+        state = service.get_dashboard_state(None, jobs_limit=10, events_limit=20, failed_limit=20)
+        assert [job.job_id for job in state.jobs] == [job_id]
+        assert state.snapshot is not None
+        assert state.snapshot.job_id == job_id
+        assert state.snapshot.stats["images"]["completed_images"] == 1
 
-        store.add_event(job_id, "custom_old", "old")
-        store.add_event(job_id, "custom_new", "new")
+        missing = service.get_dashboard_state("job_missing")
+        assert [job.job_id for job in missing.jobs] == [job_id]
+        assert missing.snapshot is None
     finally:
-        store.close()
-
-    service = SnapshotService(cfg.state_db)
-    snapshot = service.get_snapshot(job_id, events_limit=20, failed_limit=20)
-    assert snapshot is not None
-    assert [page.page_num for page in snapshot.pages] == [1, 2]
-    assert snapshot.events[0]["event_type"] == "custom_new"
-    assert snapshot.events[1]["event_type"] == "custom_old"
+        service.close()
 
 
 def test_snapshot_service_can_load_run_config_from_job(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
+    cfg = make_config(workspace_temp_dir)
     job_id = compute_job_id(cfg)
-    store = StateStore(cfg.state_db)
-    try:
+    with StateStore(cfg.state_db, durable=False) as store:
         store.upsert_job(job_id, run_config_json(cfg), "running")
-    finally:
-        store.close()
 
     service = SnapshotService(cfg.state_db)
-    latest = service.latest_job()
-    assert latest is not None
-    assert latest.job_id == job_id
-    loaded = service.load_run_config_from_job(job_id)
-    assert loaded is not None
-    assert loaded.url_template == cfg.url_template
-    assert loaded.state_db == cfg.state_db
+    try:
+        latest = service.latest_job()
+        assert latest is not None
+        assert latest.job_id == job_id
+        loaded = service.load_run_config_from_job(job_id)
+        assert loaded is not None
+        assert loaded.url_template == cfg.url_template
+        assert loaded.state_db == cfg.state_db
+    finally:
+        service.close()
 
 
 def test_snapshot_service_load_run_config_fills_missing_state_db(
@@ -180,32 +218,39 @@ def test_snapshot_service_load_run_config_fills_missing_state_db(
         "start_num": 1,
         "end_num": 3,
     }
-    store = StateStore(state_db)
-    try:
+    with StateStore(state_db, durable=False) as store:
         store.upsert_job("job_missing_state_db", json.dumps(payload), "completed")
-    finally:
-        store.close()
 
     service = SnapshotService(state_db)
-    fallback_db = workspace_temp_dir / "fallback.sqlite3"
-    loaded = service.load_run_config_from_job(
-        "job_missing_state_db",
-        fallback_state_db=fallback_db,
-    )
-    assert loaded is not None
-    assert loaded.state_db == fallback_db
-    assert loaded.end_num == 3
+    try:
+        fallback_db = workspace_temp_dir / "fallback.sqlite3"
+        loaded = service.load_run_config_from_job(
+            "job_missing_state_db",
+            fallback_state_db=fallback_db,
+        )
+        assert loaded is not None
+        assert loaded.state_db == fallback_db
+        assert loaded.end_num == 3
+    finally:
+        service.close()
 
 
-def test_snapshot_service_load_run_config_returns_none_on_invalid_json(
-    workspace_temp_dir: Path,
+@pytest.mark.parametrize(
+    "config_json",
+    [
+        pytest.param("{bad-json", id="invalid-json"),
+        pytest.param(json.dumps(["not", "a", "dict"]), id="non-object-json"),
+    ],
+)
+def test_snapshot_service_load_run_config_returns_none_for_unusable_json(
+    workspace_temp_dir: Path, config_json: str
 ) -> None:
     state_db = workspace_temp_dir / "state.sqlite3"
-    store = StateStore(state_db)
-    try:
-        store.upsert_job("job_bad_json", "{bad-json", "failed")
-    finally:
-        store.close()
+    with StateStore(state_db, durable=False) as store:
+        store.upsert_job("job_bad_json", config_json, "failed")
 
     service = SnapshotService(state_db)
-    assert service.load_run_config_from_job("job_bad_json") is None
+    try:
+        assert service.load_run_config_from_job("job_bad_json") is None
+    finally:
+        service.close()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("textual")
+
+from textual.app import App, ComposeResult  # noqa: E402
+
+from image_harvester.models import JobState  # noqa: E402
+from image_harvester.tui.widgets import JobsTable  # noqa: E402
+
+
+class _JobsApp(App[None]):
+    def compose(self) -> ComposeResult:
+        yield JobsTable(id="jobs-table")
+
+
+def _job(status: str, finished_at: str | None = None) -> JobState:
+    return JobState(
+        job_id="job-1",
+        status=status,
+        config_json="{}",
+        started_at="2026-01-01T00:00:00",
+        updated_at="2026-01-01T00:00:00",
+        finished_at=finished_at,
+    )
+
+
+def test_in_place_update_widens_auto_width_column() -> None:
+    async def scenario() -> tuple[int, int, int, int]:
+        app = _JobsApp()
+        async with app.run_test() as pilot:
+            table = app.query_one(JobsTable)
+            table.set_jobs([_job("ok")])
+            await pilot.pause()
+            status_key, finished_key = table._column_keys[1], table._column_keys[3]
+            columns = table.columns
+            before = (columns[status_key].content_width, columns[finished_key].content_width)
+
+            table.set_jobs([_job("failed_fetch", "2026-01-01T12:34:56")])
+            await pilot.pause()
+            after = (columns[status_key].content_width, columns[finished_key].content_width)
+            return (*before, *after)
+
+    status_before, finished_before, status_after, finished_after = asyncio.run(scenario())
+    assert status_after == len("failed_fetch") > status_before
+    assert finished_after == len("2026-01-01 12:34:56") > finished_before
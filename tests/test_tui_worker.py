@@ -1,107 +1,31 @@
 from __future__ import annotations
 
-import hashlib
+from dataclasses import replace
 from pathlib import Path
 
-from image_harvester.models import DownloadResult, FetchResult, RunConfig, utc_now_iso
-from image_harvester.tui.services import RunWorker
-
-
-class FakeFetcher:
-    def __init__(self, html_by_url: dict[str, str]) -> None:
-        self.html_by_url = html_by_url
-
-    def fetch(self, url: str, timeout_sec: float) -> FetchResult:
-        html = self.html_by_url.get(url)
-        if html is None:
-            return FetchResult(
-                url=url,
-                ok=False,
-                html=None,
-                status_code=404,
-                error="not found",
-                elapsed_ms=1,
-            )
-        return FetchResult(
-            url=url,
-            ok=True,
-            html=html,
-            status_code=200,
-            error=None,
-            elapsed_ms=1,
-        )
-
-
-class AlwaysSuccessDownloader:
-    def download(
-        self,
-        url: str,
-        destination: Path,
-        timeout_sec: float,
-        retries: int,
-        delay_sec: float,
-    ) -> DownloadResult:
-        payload = url.encode("utf-8")
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        destination.write_bytes(payload)
-        return DownloadResult(
-            ok=True,
-            retries_used=0,
-            http_status=200,
-            content_type="image/jpeg",
-            size_bytes=len(payload),
-            sha256=hashlib.sha256(payload).hexdigest(),
-            downloaded_at=utc_now_iso(),
-            error=None,
-        )
-
-
-class CrashDownloader:
-    def download(
-        self,
-        url: str,
-        destination: Path,
-        timeout_sec: float,
-        retries: int,
-        delay_sec: float,
-    ) -> DownloadResult:
-        raise RuntimeError("simulated downloader crash")
-
-
-def _config(tmp_path: Path, **overrides: object) -> RunConfig:
-    payload: dict[str, object] = {
-        "url_template": "https://example.test/gallery/{num}.html",
-        "start_num": 1,
-        "end_num": 1,
-        "output_dir": tmp_path / "downloads",
-        "state_db": tmp_path / "state.sqlite3",
-        "request_delay_sec": 0.0,
-        "page_retries": 0,
-        "image_retries": 0,
-    }
-    payload.update(overrides)
-    return RunConfig(**payload)
-
-
-def _html_for(*images: str) -> str:
-    tags = "\n".join([f'<img src="{url}" />' for url in images])
-    return (
-        "<html><body>"
-        f"<div id='tishi'><p>全本<span>{len(images)}</span>张图片，欣赏完整作品</p></div>"
-        f"<div class='gallerypic'>{tags}</div>"
-        "</body></html>"
-    )
+import pytest
+
+from _harness import DOWNLOADER, ONE_IMAGE_SITE, CrashDownloader, FakeFetcher, make_config
+from image_harvester.tui.services import RunWorker, build_fetchers_for_config
+
+
+def test_build_fetchers_dispatches_on_engine(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+    primary, fallback, warnings = build_fetchers_for_config(cfg)
+    assert primary is not None
+    assert fallback is None
+    assert list(warnings) == []
+
+    with pytest.raises(ValueError, match="不支持的引擎"):
+        build_fetchers_for_config(replace(cfg, engine="unknown"))
 
 
 def test_worker_runs_pipeline_to_completed(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_for("https://img.test/001.jpg"),
-    }
+    cfg = make_config(workspace_temp_dir)
     worker = RunWorker(
         cfg,
-        fetcher_builder=lambda _: (FakeFetcher(html_by_url), None, []),
-        downloader=AlwaysSuccessDownloader(),
+        fetcher_builder=lambda _: (FakeFetcher(ONE_IMAGE_SITE), None, []),
+        downloader=DOWNLOADER,
     )
     worker.start()
     assert worker.wait(timeout=5.0)
@@ -112,14 +36,49 @@ def test_worker_runs_pipeline_to_completed(workspace_temp_dir: Path) -> None:
     assert snapshot.summary["images"]["completed_images"] == 1
 
 
+def test_worker_publishes_read_only_summary(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+    worker = RunWorker(
+        cfg,
+        fetcher_builder=lambda _: (
+            FakeFetcher(ONE_IMAGE_SITE),
+            None,
+            ["fallback disabled", "fallback disabled"],
+        ),
+        downloader=DOWNLOADER,
+    )
+    worker.start()
+    assert worker.wait(timeout=5.0)
+    first = worker.snapshot()
+    second = worker.snapshot()
+    assert first.summary is not None
+    assert first.summary is second.summary
+    assert first.warnings == ("fallback disabled",)
+    with pytest.raises(TypeError):
+        first.summary["images"]["completed_images"] = 0  # type: ignore[index]
+
+
+def test_worker_wait_for_change_reports_each_transition_once(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+    worker = RunWorker(
+        cfg,
+        fetcher_builder=lambda _: (FakeFetcher(ONE_IMAGE_SITE), None, []),
+        downloader=DOWNLOADER,
+    )
+    assert worker.wait_for_change(0) is None
+    worker.start()
+    assert worker.wait(timeout=5.0)
+    changed = worker.wait_for_change(0)
+    assert changed is not None
+    assert changed.status == "completed"
+    assert worker.wait_for_change(0) is None
+
+
 def test_worker_reports_failure_when_pipeline_raises(workspace_temp_dir: Path) -> None:
-    cfg = _config(workspace_temp_dir)
-    html_by_url = {
-        "https://example.test/gallery/1.html": _html_for("https://img.test/001.jpg"),
-    }
+    cfg = make_config(workspace_temp_dir)
     worker = RunWorker(
         cfg,
-        fetcher_builder=lambda _: (FakeFetcher(html_by_url), None, []),
+        fetcher_builder=lambda _: (FakeFetcher(ONE_IMAGE_SITE), None, []),
         downloader=CrashDownloader(),
     )
     worker.start()
@@ -127,3 +86,36 @@ def test_worker_reports_failure_when_pipeline_raises(workspace_temp_dir: Path) -
     snapshot = worker.snapshot()
     assert snapshot.status == "failed"
     assert "simulated downloader crash" in (snapshot.error or "")
+
+
+def test_worker_notifies_state_change_on_completion(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+    notified: list[str] = []
+    worker = RunWorker(
+        cfg,
+        fetcher_builder=lambda _: (FakeFetcher(ONE_IMAGE_SITE), None, ["fallback disabled"]),
+        downloader=DOWNLOADER,
+        on_state_change=lambda: notified.append(worker.snapshot().status),
+    )
+    worker.start()
+    assert worker.wait(timeout=5.0)
+    assert notified == ["running", "completed"]
+
+
+def test_worker_reports_failing_state_change_callback(workspace_temp_dir: Path) -> None:
+    cfg = make_config(workspace_temp_dir)
+
+    def broken_callback() -> None:
+        raise RuntimeError("post failed")
+
+    worker = RunWorker(
+        cfg,
+        fetcher_builder=lambda _: (FakeFetcher(ONE_IMAGE_SITE), None, []),
+        downloader=DOWNLOADER,
+        on_state_change=broken_callback,
+    )
+    worker.start()
+    assert worker.wait(timeout=5.0)
+    snapshot = worker.snapshot()
+    assert snapshot.status == "completed"
+    assert snapshot.warnings == ("状态回调失败: post failed",)